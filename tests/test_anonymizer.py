@@ -0,0 +1,66 @@
+"""
+PII匿名化サービスのテスト
+"""
+
+from yamii.core.anonymizer import PIIAnonymizer
+
+# === PIIAnonymizer テスト ===
+
+
+class TestPIIAnonymizer:
+    """PIIAnonymizer のテスト"""
+
+    def test_anonymize_and_restore(self):
+        """複数種別のPIIを匿名化し、元のテキストに復元できる"""
+        anonymizer = PIIAnonymizer()
+        text = "私は山田太郎です。電話は090-1234-5678、メールはtaro@example.com"
+
+        result = anonymizer.anonymize(text)
+
+        assert "090-1234-5678" not in result.anonymized_text
+        assert "taro@example.com" not in result.anonymized_text
+        assert "[PHONE_1]" in result.anonymized_text
+        assert "[EMAIL_1]" in result.anonymized_text
+        assert "[NAME_1]" in result.anonymized_text
+        assert result.pii_count == 3
+        assert anonymizer.deanonymize(result.anonymized_text, result.mapping) == text
+
+    def test_placeholders_numbered_in_order(self):
+        """同じ種別のPIIは出現順に番号付けされる"""
+        anonymizer = PIIAnonymizer()
+
+        result = anonymizer.anonymize("090-1111-2222と080-3333-4444")
+
+        assert result.anonymized_text == "[PHONE_1]と[PHONE_2]"
+        assert result.mapping["[PHONE_1]"] == "090-1111-2222"
+        assert result.mapping["[PHONE_2]"] == "080-3333-4444"
+
+    def test_text_without_pii_unchanged(self):
+        """PIIを含まないテキストはそのまま"""
+        anonymizer = PIIAnonymizer()
+
+        result = anonymizer.anonymize("今日はいい天気ですね")
+
+        assert result.anonymized_text == "今日はいい天気ですね"
+        assert result.mapping == {}
+        assert result.pii_count == 0
+
+    def test_deanonymize_single_pass(self):
+        """復元値に含まれるプレースホルダー風の文字列は再置換されない"""
+        anonymizer = PIIAnonymizer()
+        mapping = {"[NAME_1]": "[EMAIL_1]", "[EMAIL_1]": "taro@example.com"}
+
+        restored = anonymizer.deanonymize("[NAME_1]と[EMAIL_1]と[PHONE_9]", mapping)
+
+        assert restored == "[EMAIL_1]とtaro@example.comと[PHONE_9]"
+
+    def test_anonymize_batch_shares_numbering(self):
+        """バッチ内ではプレースホルダーの連番が共有され衝突しない"""
+        anonymizer = PIIAnonymizer()
+
+        results = anonymizer.anonymize_batch(["090-1111-2222です", "080-3333-4444です"])
+
+        assert results[0].anonymized_text == "[PHONE_1]です"
+        assert results[1].anonymized_text == "[PHONE_2]です"
+        mapping = {**results[0].mapping, **results[1].mapping}
+        assert mapping == {"[PHONE_1]": "090-1111-2222", "[PHONE_2]": "080-3333-4444"}
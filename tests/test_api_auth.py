@@ -50,6 +50,27 @@ class TestRateLimiter:
         assert allowed is False
         assert info["remaining"] == 0
 
+    def test_requests_expire_after_window(self):
+        """ウィンドウを過ぎたリクエストは数えられない"""
+        limiter = RateLimiter(max_requests=2, window_seconds=60)
+
+        mock_request = MagicMock()
+        mock_request.headers = {}
+        mock_request.client.host = "127.0.0.1"
+
+        with patch("yamii.api.auth.time.time", return_value=1000.0):
+            for _ in range(2):
+                allowed, _ = limiter.is_allowed(mock_request)
+                assert allowed is True
+            allowed, _ = limiter.is_allowed(mock_request)
+            assert allowed is False
+
+        # ウィンドウ経過後は再び許可される
+        with patch("yamii.api.auth.time.time", return_value=1061.0):
+            allowed, info = limiter.is_allowed(mock_request)
+            assert allowed is True
+            assert info["remaining"] == 1
+
     def test_different_clients_have_separate_limits(self):
         """異なるクライアントは別々の制限を持つ"""
         limiter = RateLimiter(max_requests=2, window_seconds=60)
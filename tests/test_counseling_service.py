@@ -8,6 +8,8 @@ CounselingService のテスト
 - フェーズ遷移が正しく動作するか
 """
 
+import os
+
 import pytest
 
 from yamii.domain.models.emotion import EmotionType
@@ -15,6 +17,7 @@ from yamii.domain.models.relationship import RelationshipPhase
 from yamii.domain.models.user import UserState
 from yamii.domain.ports.ai_port import ChatMessage, IAIProvider
 from yamii.domain.ports.storage_port import IStorage
+from yamii.domain.services import counseling as counseling_module
 from yamii.domain.services.counseling import (
     AdviceTypeClassifier,
     CounselingRequest,
@@ -491,6 +494,20 @@ class TestEmotionServiceLLM:
         assert result.primary_emotion == EmotionType.SADNESS
         assert result.confidence > 0
 
+    def test_overlapping_keywords_scored(self):
+        """重なり合うキーワードも個別に加点される"""
+        service = EmotionService()
+        scores = service._calculate_emotion_scores_fast(
+            "やったー！寂しいけど生きるのが辛い"
+        )
+
+        # 「やったー」と「やった」の両方
+        assert scores[EmotionType.HAPPINESS] == 4.0
+        # 「寂しい」と「生きるのが辛い」内の「辛い」
+        assert scores[EmotionType.SADNESS] == 6.0
+        assert scores[EmotionType.LONELINESS] == 2.5
+        assert scores[EmotionType.DEPRESSION] == 5.0
+
     def test_euphemism_detection_trigger(self):
         """婉曲表現でLLM分析トリガーが検出される"""
         service = EmotionService()
@@ -629,3 +646,46 @@ class TestEmotionServiceLLM:
         assert merged.is_crisis is True
         assert merged.primary_emotion == EmotionType.DEPRESSION
         assert merged.confidence == 0.8  # LLM分析は高信頼度
+
+
+# === プロンプト読み込みテスト ===
+
+
+class TestPromptFileCache:
+    """YAMII.md 読み込みキャッシュのテスト"""
+
+    def test_cache_is_keyed_by_path(self, tmp_path, monkeypatch):
+        """更新時刻・サイズが同じでも、別ファイルなら読み直す"""
+        first = tmp_path / "first.md"
+        second = tmp_path / "second.md"
+        first.write_text("プロンプトA", encoding="utf-8")
+        second.write_text("プロンプトB", encoding="utf-8")
+        mtime_ns = first.stat().st_mtime_ns
+        os.utime(second, ns=(mtime_ns, mtime_ns))
+
+        monkeypatch.setattr(counseling_module, "_prompt_cache", None)
+        monkeypatch.setattr(counseling_module, "DEFAULT_PROMPT_FILE", first)
+        assert counseling_module._load_prompt_from_file() == "プロンプトA"
+
+        monkeypatch.setattr(counseling_module, "DEFAULT_PROMPT_FILE", second)
+        assert counseling_module._load_prompt_from_file() == "プロンプトB"
+
+    def test_reloads_when_file_changes(self, tmp_path, monkeypatch):
+        """更新時刻またはサイズが変わったら読み直す"""
+        prompt_file = tmp_path / "YAMII.md"
+        prompt_file.write_text("初版", encoding="utf-8")
+        monkeypatch.setattr(counseling_module, "_prompt_cache", None)
+        monkeypatch.setattr(counseling_module, "DEFAULT_PROMPT_FILE", prompt_file)
+        assert counseling_module._load_prompt_from_file() == "初版"
+
+        # 同じサイズの内容に書き換え、更新時刻だけを変える
+        mtime_ns = prompt_file.stat().st_mtime_ns
+        prompt_file.write_text("改版", encoding="utf-8")
+        os.utime(prompt_file, ns=(mtime_ns + 1_000_000, mtime_ns + 1_000_000))
+        assert counseling_module._load_prompt_from_file() == "改版"
+
+        # 更新時刻はそのままでサイズだけを変える
+        mtime_ns = prompt_file.stat().st_mtime_ns
+        prompt_file.write_text("第三版です", encoding="utf-8")
+        os.utime(prompt_file, ns=(mtime_ns, mtime_ns))
+        assert counseling_module._load_prompt_from_file() == "第三版です"
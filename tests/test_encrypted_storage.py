@@ -7,6 +7,7 @@
 - GDPR対応エクスポート
 """
 
+import json
 import os
 import shutil
 import tempfile
@@ -186,6 +187,71 @@ class TestEncryptedFileStorageAdapter:
         assert loaded_user.user_id == sample_user.user_id
         assert loaded_user.display_name == sample_user.display_name
 
+    @pytest.mark.asyncio
+    async def test_only_saved_users_are_reencrypted(
+        self, storage, sample_user, temp_dir
+    ):
+        """保存されたユーザーのみ再暗号化され、削除も反映される"""
+        user2 = UserState(user_id="user_2")
+        await storage.save_user(sample_user)
+        await storage.save_user(user2)
+        await storage.flush()
+
+        data_file = Path(temp_dir) / "users.enc.json"
+        before = json.loads(data_file.read_text(encoding="utf-8"))
+
+        sample_user.total_interactions += 1
+        await storage.save_user(sample_user)
+        await storage.flush()
+        after = json.loads(data_file.read_text(encoding="utf-8"))
+
+        users_before = before["encrypted_users"]
+        users_after = after["encrypted_users"]
+        assert users_after["user_2"] == users_before["user_2"]
+        assert users_after["test_user_123"] != users_before["test_user_123"]
+
+        await storage.delete_user("user_2")
+        await storage.flush()
+        deleted = json.loads(data_file.read_text(encoding="utf-8"))
+        assert "user_2" not in deleted["encrypted_users"]
+
+    @pytest.mark.asyncio
+    async def test_legacy_argon2id_data_is_migrated(
+        self, storage, key_manager, sample_user, crypto, temp_dir
+    ):
+        """旧形式（Argon2id派生キー）のデータを読み込み、新形式で再保存する"""
+        # テスト高速化のためArgon2idのコストを最小にする
+        key_manager.OPSLIMIT = 1
+        key_manager.MEMLIMIT = 8192
+
+        legacy_key = key_manager.derive_legacy_user_key(sample_user.user_id)
+        encrypted = crypto.encrypt_large_data(
+            json.dumps(sample_user.to_dict(), ensure_ascii=False), legacy_key
+        )
+        data_file = Path(temp_dir) / "users.enc.json"
+        data_file.write_text(
+            json.dumps(
+                {
+                    "encrypted_users": {sample_user.user_id: encrypted.to_dict()},
+                    "version": "2.0",
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        loaded = await storage.load_user(sample_user.user_id)
+        assert loaded is not None
+        assert loaded.display_name == sample_user.display_name
+
+        await storage.flush()
+        migrated = json.loads(data_file.read_text(encoding="utf-8"))
+        assert migrated["version"] == storage.FORMAT_VERSION
+
+        reloaded = EncryptedFileStorageAdapter(
+            data_dir=temp_dir, key_manager=key_manager
+        )
+        assert await reloaded.load_user(sample_user.user_id) is not None
+
     @pytest.mark.asyncio
     async def test_export_decrypted(self, storage, sample_user):
         """GDPR対応: 復号エクスポート"""
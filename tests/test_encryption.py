@@ -0,0 +1,75 @@
+"""
+E2EE暗号化システムのテスト
+"""
+
+import pytest
+
+from yamii.core.encryption import E2EECrypto, EncryptedData
+
+
+@pytest.fixture
+def crypto():
+    """暗号化システム"""
+    return E2EECrypto()
+
+
+class TestE2EECrypto:
+    """E2EECrypto のテスト"""
+
+    def test_encrypt_decrypt_roundtrip(self, crypto):
+        """公開鍵で暗号化したテキストを秘密鍵で復号できる"""
+        public_key, private_key = crypto.generate_key_pair()
+
+        encrypted = crypto.encrypt("こんにちは、世界", public_key)
+
+        assert encrypted.metadata["algorithm"] == "nacl.Box"
+        assert crypto.decrypt(encrypted, private_key) == "こんにちは、世界"
+
+    def test_decrypt_with_wrong_key_fails(self, crypto):
+        """別の秘密鍵では復号できない"""
+        public_key, _ = crypto.generate_key_pair()
+        _, other_private_key = crypto.generate_key_pair()
+
+        encrypted = crypto.encrypt("秘密", public_key)
+
+        with pytest.raises(Exception):
+            crypto.decrypt(encrypted, other_private_key)
+
+    def test_large_data_roundtrip(self, crypto):
+        """対称鍵で暗号化したデータを復号できる"""
+        key = crypto.generate_symmetric_key()
+
+        encrypted = crypto.encrypt_large_data("大きなデータ" * 100, key)
+
+        assert crypto.decrypt_large_data(encrypted, key) == "大きなデータ" * 100
+
+    def test_bytes_roundtrip(self, crypto):
+        """bytes はエンコードせずに暗号化し、as_bytes で bytes のまま復号できる"""
+        public_key, private_key = crypto.generate_key_pair()
+        key = crypto.generate_symmetric_key()
+        payload = bytes(range(256))
+
+        encrypted = crypto.encrypt(payload, public_key)
+        large = crypto.encrypt_large_data(payload, key)
+
+        assert crypto.decrypt(encrypted, private_key, as_bytes=True) == payload
+        assert crypto.decrypt_large_data(large, key, as_bytes=True) == payload
+
+    def test_encrypted_data_binary_roundtrip(self, crypto):
+        """EncryptedData はバイナリ形式で保存・復元できる"""
+        key = crypto.generate_symmetric_key()
+        encrypted = crypto.encrypt_large_data("バイナリ保存", key)
+
+        restored = EncryptedData.from_bytes(encrypted.to_bytes())
+
+        assert restored == encrypted
+        assert crypto.decrypt_large_data(restored, key) == "バイナリ保存"
+
+    def test_encrypted_data_from_truncated_bytes_fails(self, crypto):
+        """途中で切れたバイナリは復元できない"""
+        key = crypto.generate_symmetric_key()
+        data = crypto.encrypt_large_data("バイナリ保存", key).to_bytes()
+
+        for truncated in (data[:4], data[:20], data[:-1]):
+            with pytest.raises(ValueError):
+                EncryptedData.from_bytes(truncated)
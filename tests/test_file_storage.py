@@ -0,0 +1,71 @@
+"""
+ファイルストレージアダプターのテスト
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from yamii.adapters.storage.file import FileStorageAdapter
+from yamii.domain.models.user import UserState
+
+
+@pytest.fixture
+def temp_dir():
+    """一時ディレクトリを作成"""
+    temp = tempfile.mkdtemp()
+    yield temp
+    shutil.rmtree(temp)
+
+
+class TestFileStorageAdapter:
+    """ファイルストレージのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_corrupt_record_leaves_no_orphaned_users(self, temp_dir):
+        """途中のレコードが壊れていても、読み込めないユーザーがファイルに残らない"""
+        data_file = Path(temp_dir) / "users.json"
+        data_file.write_text(
+            json.dumps(
+                {
+                    "users": {
+                        "valid_user": UserState(user_id="valid_user").to_dict(),
+                        "broken_user": {"phase": "stranger"},  # user_id 欠損
+                    }
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        storage = FileStorageAdapter(data_dir=temp_dir)
+        assert await storage.list_users() == []
+
+        await storage.save_user(UserState(user_id="new_user"))
+        await storage.flush()
+
+        saved = json.loads(data_file.read_text(encoding="utf-8"))
+        assert list(saved["users"]) == ["new_user"]
+
+        reloaded = FileStorageAdapter(data_dir=temp_dir)
+        assert await reloaded.list_users() == ["new_user"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_enum_value_raises(self, temp_dir):
+        """未知の列挙値は読み飛ばさず ValueError になり、ファイルも変更されない"""
+        user_data = UserState(user_id="stale_user").to_dict()
+        user_data["phase"] = "unknown_phase"
+        data_file = Path(temp_dir) / "users.json"
+        content = json.dumps({"users": {"stale_user": user_data}})
+        data_file.write_text(content, encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            UserState.from_dict(user_data)
+
+        storage = FileStorageAdapter(data_dir=temp_dir)
+        with pytest.raises(ValueError):
+            await storage.list_users()
+
+        assert data_file.read_text(encoding="utf-8") == content
@@ -0,0 +1,87 @@
+"""
+ドメインモデルのテスト
+"""
+
+from datetime import datetime
+
+import pytest
+
+from yamii.domain.models.conversation import ConversationContext, Episode, Message
+from yamii.domain.models.user import UserState
+
+# === 会話モデル テスト ===
+
+
+class TestConversationModels:
+    """Message / Episode / ConversationContext のテスト"""
+
+    def test_from_dict_rejects_unknown_enum_values(self):
+        """未知の列挙値は既定値に置き換えず ValueError になる"""
+        with pytest.raises(ValueError):
+            Message.from_dict(
+                {"id": "1", "role": "user", "content": "x", "emotion": "unknown"}
+            )
+        with pytest.raises(ValueError):
+            Episode.from_dict(
+                {
+                    "id": "1",
+                    "user_id": "u",
+                    "created_at": "2025-01-01T00:00:00",
+                    "episode_type": "unknown",
+                }
+            )
+        with pytest.raises(ValueError):
+            ConversationContext.from_dict(
+                {"user_id": "u", "session_id": "s", "phase": "unknown"}
+            )
+
+    def test_message_to_dict_is_stable(self):
+        """to_dict を繰り返しても同じ結果になり、返した dict の変更は波及しない"""
+        message = Message(id="1", role="user", content="こんにちは")
+        first = message.to_dict()
+        first["content"] = "変更"
+
+        second = message.to_dict()
+
+        assert second["content"] == "こんにちは"
+        assert second == message.to_dict()
+
+        message.content = "更新後"
+        assert message.to_dict()["content"] == "更新後"
+
+    def test_episode_created_at_cache_follows_reassignment(self):
+        """created_at を差し替えると to_dict の出力も更新される"""
+        episode = Episode(
+            id="1", user_id="u", created_at=datetime(2025, 1, 1), summary="s"
+        )
+        assert episode.to_dict()["created_at"] == "2025-01-01T00:00:00"
+
+        episode.created_at = datetime(2026, 2, 2)
+
+        assert episode.to_dict()["created_at"] == "2026-02-02T00:00:00"
+
+
+# === ユーザーモデル テスト ===
+
+
+class TestUserState:
+    """UserState のテスト"""
+
+    def test_timestamp_cache_follows_reassignment(self):
+        """first_interaction / created_at を差し替えると to_dict の出力も更新される"""
+        user = UserState(
+            user_id="u",
+            first_interaction=datetime(2025, 1, 1),
+            created_at=datetime(2025, 1, 1),
+        )
+        data = user.to_dict()
+        assert data["first_interaction"] == "2025-01-01T00:00:00"
+        assert data["created_at"] == "2025-01-01T00:00:00"
+
+        user.first_interaction = datetime(2026, 2, 2)
+        user.created_at = datetime(2026, 3, 3)
+        data = user.to_dict()
+
+        assert data["first_interaction"] == "2026-02-02T00:00:00"
+        assert data["created_at"] == "2026-03-03T00:00:00"
+        assert UserState.from_dict(data) == user
@@ -5,7 +5,6 @@ PII匿名化機能付き
 """
 
 import json
-import re
 from collections.abc import AsyncGenerator
 
 import aiohttp
@@ -23,6 +22,10 @@ class OpenAIAdapter(IAIProvider):
     PII匿名化機能を内蔵。
     """
 
+    # 接続プール設定（同一ホストへの並行リクエストでソケットを再利用）
+    MAX_CONNECTIONS = 64
+    KEEPALIVE_TIMEOUT = 30
+
     def __init__(
         self,
         api_key: str,
@@ -38,12 +41,30 @@ class OpenAIAdapter(IAIProvider):
         self.enable_anonymization = enable_anonymization
         self._anonymizer: PIIAnonymizer | None = None
         self._session: aiohttp.ClientSession | None = None
+        self._completions_url = f"{base_url}/chat/completions"
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        """共有HTTPセッションを取得（遅延初期化）"""
+        """
+        共有HTTPセッションを取得（遅延初期化）
+
+        接続はプールしてkeep-aliveで再利用し、毎回同じ認証ヘッダーは
+        セッションのデフォルトヘッダーとして一度だけ構築する。
+        """
         if self._session is None or self._session.closed:
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self._session = aiohttp.ClientSession(timeout=timeout)
+            connector = aiohttp.TCPConnector(
+                limit=self.MAX_CONNECTIONS,
+                limit_per_host=self.MAX_CONNECTIONS,
+                keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                timeout=timeout,
+                connector=connector,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
         return self._session
 
     async def close(self) -> None:
@@ -58,6 +79,41 @@ class OpenAIAdapter(IAIProvider):
             self._anonymizer = get_anonymizer()
         return self._anonymizer
 
+    def _anonymize_inputs(
+        self,
+        message: str,
+        conversation_history: list[ChatMessage] | None,
+    ) -> tuple[str, list[ChatMessage] | None, dict[str, str]]:
+        """
+        メッセージと会話履歴のPIIをまとめて匿名化
+
+        連番をメッセージ・履歴全体で共有するため、プレースホルダーが
+        メッセージ間で衝突せず、統合したマッピングで正しく復元できる。
+
+        Returns:
+            (匿名化済みメッセージ, 匿名化済み会話履歴, プレースホルダー→元の値)
+        """
+        if not self.enable_anonymization:
+            return message, conversation_history, {}
+
+        history = conversation_history or []
+        results = self.anonymizer.anonymize_batch(
+            [message, *(msg.content for msg in history)]
+        )
+
+        mapping: dict[str, str] = {}
+        for result in results:
+            mapping.update(result.mapping)
+
+        processed_history = None
+        if conversation_history:
+            processed_history = [
+                ChatMessage(role=msg.role, content=result.anonymized_text)
+                for msg, result in zip(history, results[1:])
+            ]
+
+        return results[0].anonymized_text, processed_history, mapping
+
     async def generate(
         self,
         message: str,
@@ -81,26 +137,9 @@ class OpenAIAdapter(IAIProvider):
             Exception: API呼び出し失敗時
         """
         # PII匿名化
-        mapping: dict[str, str] = {}
-        processed_message = message
-        processed_history: list[ChatMessage] | None = None
-
-        if self.enable_anonymization:
-            result = self.anonymizer.anonymize(message)
-            processed_message = result.anonymized_text
-            mapping = result.mapping
-
-            # 会話履歴も匿名化
-            if conversation_history:
-                processed_history = []
-                for msg in conversation_history:
-                    history_result = self.anonymizer.anonymize(msg.content)
-                    processed_history.append(
-                        ChatMessage(role=msg.role, content=history_result.anonymized_text)
-                    )
-                    mapping.update(history_result.mapping)
-        else:
-            processed_history = conversation_history
+        processed_message, processed_history, mapping = self._anonymize_inputs(
+            message, conversation_history
+        )
 
         # API呼び出し
         response_text = await self._call_api(
@@ -140,15 +179,9 @@ class OpenAIAdapter(IAIProvider):
         if max_tokens:
             request_body["max_tokens"] = max_tokens
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
         session = await self._get_session()
         async with session.post(
-            f"{self.base_url}/chat/completions",
-            headers=headers,
+            self._completions_url,
             json=request_body,
         ) as response:
             if response.status != 200:
@@ -181,50 +214,27 @@ class OpenAIAdapter(IAIProvider):
         conversation_history: list[ChatMessage] | None = None,
     ) -> AsyncGenerator[str, None]:
         """AI応答をストリーミング生成（PII匿名化/復元付き）"""
-        mapping: dict[str, str] = {}
-        processed_message = message
-        processed_history: list[ChatMessage] | None = None
-
-        if self.enable_anonymization:
-            result = self.anonymizer.anonymize(message)
-            processed_message = result.anonymized_text
-            mapping = result.mapping
-
-            if conversation_history:
-                processed_history = []
-                for msg in conversation_history:
-                    history_result = self.anonymizer.anonymize(msg.content)
-                    processed_history.append(
-                        ChatMessage(role=msg.role, content=history_result.anonymized_text)
-                    )
-                    mapping.update(history_result.mapping)
-        else:
-            processed_history = conversation_history
+        processed_message, processed_history, mapping = self._anonymize_inputs(
+            message, conversation_history
+        )
 
         if mapping:
             # PII復元が必要な場合、バッファリングして復元
-            # プレースホルダーパターン: [PERSON_1] 等
-            placeholder_pattern = re.compile(r"\[[A-Z_]+\d*\]")
             buffer = ""
             async for chunk in self._call_api_stream(
                 processed_message, system_prompt, max_tokens, processed_history
             ):
                 buffer += chunk
                 # バッファにプレースホルダーの開始 '[' があり、まだ閉じていない場合は保留
-                if "[" in buffer and "]" not in buffer.split("[")[-1]:
+                # （バッファを分割せず、最後の '[' と ']' の位置だけを比較）
+                if buffer.rfind("[") > buffer.rfind("]"):
                     continue
                 # 復元してyield
-                restored = placeholder_pattern.sub(
-                    lambda m: mapping.get(m.group(0), m.group(0)), buffer
-                )
-                yield restored
+                yield self.anonymizer.deanonymize(buffer, mapping)
                 buffer = ""
             # 残りのバッファをflush
             if buffer:
-                restored = placeholder_pattern.sub(
-                    lambda m: mapping.get(m.group(0), m.group(0)), buffer
-                )
-                yield restored
+                yield self.anonymizer.deanonymize(buffer, mapping)
         else:
             async for chunk in self._call_api_stream(
                 processed_message, system_prompt, max_tokens, processed_history
@@ -256,15 +266,9 @@ class OpenAIAdapter(IAIProvider):
         if max_tokens:
             request_body["max_tokens"] = max_tokens
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
         session = await self._get_session()
         async with session.post(
-            f"{self.base_url}/chat/completions",
-            headers=headers,
+            self._completions_url,
             json=request_body,
         ) as response:
             if response.status != 200:
@@ -21,6 +21,9 @@ from ...domain.ports.encrypted_blob_storage_port import (
 
 logger = get_logger(__name__)
 
+# ファイル名として使えない文字
+_UNSAFE_ID_CHARS = re.compile(r"[^a-zA-Z0-9@._-]")
+
 
 class EncryptedBlobFileAdapter(IEncryptedBlobStorage):
     """
@@ -38,7 +41,7 @@ class EncryptedBlobFileAdapter(IEncryptedBlobStorage):
     def _get_blob_path(self, user_id: str) -> Path:
         """ユーザーのBlobファイルパスを取得"""
         # ユーザーIDをファイル名として安全にサニタイズ
-        safe_id = re.sub(r"[^a-zA-Z0-9@._-]", "_", user_id)
+        safe_id = _UNSAFE_ID_CHARS.sub("_", user_id)
         blob_path = self.data_dir / f"{safe_id}.blob.json"
         # パストラバーサル防止
         if not blob_path.resolve().is_relative_to(self.data_dir.resolve()):
@@ -63,7 +66,7 @@ class EncryptedBlobFileAdapter(IEncryptedBlobStorage):
         )
 
         blob_path.write_text(json.dumps(blob.to_dict(), ensure_ascii=False, indent=2))
-        logger.debug(f"Saved encrypted blob for user: {user_id}")
+        logger.debug("Saved encrypted blob for user: %s", user_id)
 
     async def load_blob(self, user_id: str) -> EncryptedBlob | None:
         """暗号化されたBlobを読み込み"""
@@ -85,7 +88,7 @@ class EncryptedBlobFileAdapter(IEncryptedBlobStorage):
 
         if blob_path.exists():
             blob_path.unlink()
-            logger.info(f"Deleted blob for user: {user_id}")
+            logger.info("Deleted blob for user: %s", user_id)
             return True
 
         return False
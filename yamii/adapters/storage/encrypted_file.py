@@ -31,14 +31,19 @@ class EncryptedFileStorageAdapter(IStorage):
 
     暗号化方式:
     - NaCl SecretBox (XSalsa20-Poly1305)
-    - ユーザーごとの派生キー (Argon2id)
+    - ユーザーごとの派生キー (HKDF-SHA256)
+    - 旧形式（v2.0, Argon2id派生キー）のデータは読み込み時に移行
 
     パフォーマンス最適化:
     - 遅延書き込み（debounce）で複数更新をまとめて保存
+    - save_user されたユーザーのみ再暗号化（他は前回の暗号文を再利用）
     - スレッドプールでI/Oブロッキングを回避
     - アトミック書き込みでデータ破損を防止
     """
 
+    # 保存形式のバージョン（3.0: HKDF-SHA256派生キー）
+    FORMAT_VERSION = "3.0"
+
     def __init__(
         self,
         data_dir: str = "data",
@@ -57,6 +62,9 @@ class EncryptedFileStorageAdapter(IStorage):
 
         # メモリキャッシュ
         self._users: dict[str, UserState] = {}
+        # シリアライズ済みデータ（保存時は変更されたユーザーのみ再生成）
+        self._serialized_users: dict[str, dict] = {}
+        self._dirty_users: set[str] = set()
         self._loaded = False
         self._lock = asyncio.Lock()
 
@@ -88,22 +96,40 @@ class EncryptedFileStorageAdapter(IStorage):
             loop = asyncio.get_event_loop()
             data = await loop.run_in_executor(None, self._read_json_file)
 
+            # 旧形式はArgon2id派生キーで復号し、次回保存時に新しいキーで再暗号化
+            legacy = data.get("version") != self.FORMAT_VERSION
+
             # 暗号化されたデータを復号
             encrypted_users = data.get("encrypted_users", {})
             for user_id, enc_data_dict in encrypted_users.items():
                 try:
                     # ユーザー固有のキーで復号
-                    user_key = self._get_user_key(user_id)
+                    if legacy:
+                        user_key = self._key_manager.derive_legacy_user_key(
+                            user_id, context="user_data"
+                        )
+                    else:
+                        user_key = self._get_user_key(user_id)
                     encrypted_data = EncryptedData.from_dict(enc_data_dict)
                     decrypted_json = self.crypto.decrypt_large_data(
                         encrypted_data, user_key
                     )
                     user_data = json.loads(decrypted_json)
                     self._users[user_id] = UserState.from_dict(user_data)
+                    if legacy:
+                        self._dirty_users.add(user_id)
+                    else:
+                        self._serialized_users[user_id] = enc_data_dict
                 except Exception as e:
                     # 復号失敗したユーザーはスキップ（鍵が変わった可能性）
                     logger.warning(f"ユーザー {user_id} の復号に失敗: {e}")
 
+            if legacy and self._dirty_users:
+                logger.info(
+                    f"旧形式の暗号化データを検出: {len(self._dirty_users)} ユーザーを次回保存時に移行します"
+                )
+                self._dirty = True
+
         except (json.JSONDecodeError, KeyError) as e:
             logger.error(f"データ読み込みエラー: {e}")
             self._users = {}
@@ -136,20 +162,23 @@ class EncryptedFileStorageAdapter(IStorage):
 
     async def _save_data_now(self) -> None:
         """データを暗号化してファイルに即時保存（アトミック書き込み）"""
-        encrypted_users = {}
-
-        for user_id, user in self._users.items():
+        # save_user された（変更のあった）ユーザーのみ再暗号化
+        dirty_users, self._dirty_users = self._dirty_users, set()
+        for user_id in dirty_users:
+            user = self._users.get(user_id)
+            if user is None:
+                continue
             # ユーザー固有のキーで暗号化
             user_key = self._get_user_key(user_id)
             user_json = json.dumps(user.to_dict(), ensure_ascii=False)
             encrypted_data = self.crypto.encrypt_large_data(user_json, user_key)
-            encrypted_users[user_id] = encrypted_data.to_dict()
+            self._serialized_users[user_id] = encrypted_data.to_dict()
 
         data = {
-            "encrypted_users": encrypted_users,
+            "encrypted_users": dict(self._serialized_users),
             "updated_at": datetime.now().isoformat(),
-            "version": "2.0",
-            "encryption": "nacl.SecretBox+Argon2id",
+            "version": self.FORMAT_VERSION,
+            "encryption": "nacl.SecretBox+HKDF-SHA256",
         }
 
         temp_file = self.data_file.with_suffix(".tmp")
@@ -163,15 +192,22 @@ class EncryptedFileStorageAdapter(IStorage):
             self._dirty = False
 
     def _write_json_file(self, path: Path, data: dict) -> None:
-        """JSONファイルを同期的に書き込み（スレッドプール用）"""
+        """
+        JSONファイルを同期的に書き込み（スレッドプール用）
+
+        json.dump はストリーム出力時にPython実装のエンコーダーを使うため、
+        C実装の json.dumps で一括生成してから一度に書き込む。
+        """
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            f.write(content)
 
     async def save_user(self, user: UserState) -> None:
         """ユーザー状態を暗号化保存（遅延書き込み）"""
         await self._ensure_loaded()
         user.updated_at = datetime.now()
         self._users[user.user_id] = user
+        self._dirty_users.add(user.user_id)
         await self._schedule_save()
 
     async def load_user(self, user_id: str) -> UserState | None:
@@ -195,6 +231,8 @@ class EncryptedFileStorageAdapter(IStorage):
         await self._ensure_loaded()
         if user_id in self._users:
             del self._users[user_id]
+            self._serialized_users.pop(user_id, None)
+            self._dirty_users.discard(user_id)
             await self._schedule_save()
             return True
         return False
@@ -21,6 +21,7 @@ class FileStorageAdapter(IStorage):
 
     JSONファイルを使用したシンプルな永続化実装。
     遅延書き込み（debounce）で複数更新をまとめて保存。
+    保存時は save_user されたユーザーのみ再シリアライズする。
     """
 
     def __init__(self, data_dir: str = "data", save_delay: float = 1.0):
@@ -30,6 +31,9 @@ class FileStorageAdapter(IStorage):
 
         # メモリキャッシュ
         self._users: dict[str, UserState] = {}
+        # シリアライズ済みデータ（保存時は変更されたユーザーのみ再生成）
+        self._serialized_users: dict[str, dict] = {}
+        self._dirty_users: set[str] = set()
         self._loaded = False
         self._lock = asyncio.Lock()
 
@@ -56,11 +60,20 @@ class FileStorageAdapter(IStorage):
             # 大きなファイルはスレッドプールで処理
             loop = asyncio.get_running_loop()
             data = await loop.run_in_executor(None, self._read_json_file)
+            # 途中で失敗しても一部のユーザーだけが残らないよう、
+            # 全件のパースに成功してからまとめて反映する
+            users: dict[str, UserState] = {}
+            serialized_users: dict[str, dict] = {}
             for user_id, user_data in data.get("users", {}).items():
-                self._users[user_id] = UserState.from_dict(user_data)
+                users[user_id] = UserState.from_dict(user_data)
+                serialized_users[user_id] = user_data
         except (json.JSONDecodeError, KeyError) as e:
             logger.error(f"データ読み込みエラー: {e}")
-            self._users = {}
+            users, serialized_users = {}, {}
+
+        self._users = users
+        self._serialized_users = serialized_users
+        self._dirty_users = set()
 
     def _read_json_file(self) -> dict:
         """JSONファイルを同期的に読み込み（スレッドプール用）"""
@@ -90,8 +103,15 @@ class FileStorageAdapter(IStorage):
 
     async def _save_data_now(self) -> None:
         """ファイルにデータを即時保存（アトミック書き込み）"""
+        # save_user された（変更のあった）ユーザーのみ再シリアライズ
+        dirty_users, self._dirty_users = self._dirty_users, set()
+        for user_id in dirty_users:
+            user = self._users.get(user_id)
+            if user is not None:
+                self._serialized_users[user_id] = user.to_dict()
+
         data = {
-            "users": {uid: u.to_dict() for uid, u in self._users.items()},
+            "users": dict(self._serialized_users),
             "updated_at": datetime.now().isoformat(),
         }
 
@@ -106,15 +126,22 @@ class FileStorageAdapter(IStorage):
             self._dirty = False
 
     def _write_json_file(self, path: Path, data: dict) -> None:
-        """JSONファイルを同期的に書き込み（スレッドプール用）"""
+        """
+        JSONファイルを同期的に書き込み（スレッドプール用）
+
+        json.dump はストリーム出力時にPython実装のエンコーダーを使うため、
+        C実装の json.dumps で一括生成してから一度に書き込む。
+        """
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            f.write(content)
 
     async def save_user(self, user: UserState) -> None:
         """ユーザー状態を保存（遅延書き込み）"""
         await self._ensure_loaded()
         user.updated_at = datetime.now()
         self._users[user.user_id] = user
+        self._dirty_users.add(user.user_id)
         await self._schedule_save()
 
     async def load_user(self, user_id: str) -> UserState | None:
@@ -132,6 +159,8 @@ class FileStorageAdapter(IStorage):
         await self._ensure_loaded()
         if user_id in self._users:
             del self._users[user_id]
+            self._serialized_users.pop(user_id, None)
+            self._dirty_users.discard(user_id)
             await self._schedule_save()
             return True
         return False
@@ -8,8 +8,9 @@ API 認証・認可
 
 from __future__ import annotations
 
+import hmac
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from collections.abc import Callable
 
 from fastapi import HTTPException, Request, Security
@@ -24,6 +25,20 @@ from ..core.config import get_settings
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
+def _is_valid_api_key(api_key: str, valid_keys: list[str]) -> bool:
+    """
+    API キーを定数時間で照合
+
+    一致したキーや一致した文字数によって応答時間が変わらないよう、
+    全キーと最後まで比較してから結果を返す。
+    """
+    candidate = api_key.encode("utf-8")
+    matched = False
+    for valid_key in valid_keys:
+        matched |= hmac.compare_digest(candidate, valid_key.encode("utf-8"))
+    return matched
+
+
 async def verify_api_key(
     api_key: str | None = Security(api_key_header),
 ) -> str:
@@ -64,7 +79,7 @@ async def verify_api_key(
             },
         )
 
-    if api_key not in settings.security.api_keys:
+    if not _is_valid_api_key(api_key, settings.security.api_keys):
         raise HTTPException(
             status_code=403,
             detail={
@@ -84,13 +99,18 @@ class RateLimiter:
     インメモリレート制限
 
     スライディングウィンドウ方式でリクエスト数を制限。
+    クライアントごとの記録は上限件数で打ち切るリングバッファで保持する。
     本番環境では Redis ベースの実装を推奨。
     """
 
     def __init__(self, max_requests: int = 100, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self._requests: dict[str, list[float]] = defaultdict(list)
+        self._requests: dict[str, deque[float]] = defaultdict(self._new_window)
+
+    def _new_window(self) -> deque[float]:
+        """クライアントごとのリクエスト記録（上限件数を超えて保持しない）"""
+        return deque(maxlen=self.max_requests)
 
     def _get_client_id(self, request: Request, api_key: str | None = None) -> str:
         """クライアント識別子を取得"""
@@ -113,7 +133,10 @@ class RateLimiter:
     def _cleanup_old_requests(self, client_id: str, current_time: float) -> None:
         """古いリクエスト記録を削除"""
         cutoff = current_time - self.window_seconds
-        self._requests[client_id] = [t for t in self._requests[client_id] if t > cutoff]
+        window = self._requests[client_id]
+        # 記録は時刻順なので、先頭から期限切れ分だけ取り除く
+        while window and window[0] <= cutoff:
+            window.popleft()
 
     def is_allowed(
         self, request: Request, api_key: str | None = None
@@ -130,11 +153,10 @@ class RateLimiter:
         # メモリ保護: エントリ数が上限を超えたら古いものをパージ
         if len(self._requests) > 10000:
             cutoff = current_time - self.window_seconds
-            self._requests = defaultdict(list, {
-                k: [t for t in v if t > cutoff]
-                for k, v in self._requests.items()
-                if any(t > cutoff for t in v)
-            })
+            # 最新の記録も期限切れのクライアントを削除
+            expired = [k for k, v in self._requests.items() if not v or v[-1] <= cutoff]
+            for k in expired:
+                del self._requests[k]
 
         self._cleanup_old_requests(client_id, current_time)
 
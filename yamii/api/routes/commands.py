@@ -64,6 +64,28 @@ HELP_TEXT_GENERIC = """Yamii - 相談AI
 
 EMPTY_MESSAGE_RESPONSE = "何かお話ししたいことがあれば、気軽に話しかけてください。"
 
+# コマンド別名 → コマンドタイプ（小文字化・前後空白除去済みのメッセージで引く）
+COMMAND_ALIASES: dict[str, str] = {
+    # ヘルプコマンド
+    "/help": "help",
+    "ヘルプ": "help",
+    "help": "help",
+    # ステータスコマンド
+    "/status": "status",
+    "ステータス": "status",
+    "status": "status",
+    # プライバシーコマンド: エクスポート
+    "/export": "export",
+    "エクスポート": "export",
+    "export": "export",
+    # プライバシーコマンド: データ削除
+    "/clear_data": "clear_data",
+    "/delete": "clear_data",
+    "データ削除": "clear_data",
+    "clear_data": "clear_data",
+    "delete": "clear_data",
+}
+
 
 @router.get("/help", response_model=CommandResponse)
 async def get_help(
@@ -120,38 +142,12 @@ async def classify_message(
             should_counsel=False,
         )
 
-    # ヘルプコマンド
-    if message in ["/help", "ヘルプ", "help"]:
-        return MessageClassification(
-            is_command=True,
-            command_type="help",
-            is_empty=False,
-            should_counsel=False,
-        )
-
-    # ステータスコマンド
-    if message in ["/status", "ステータス", "status"]:
-        return MessageClassification(
-            is_command=True,
-            command_type="status",
-            is_empty=False,
-            should_counsel=False,
-        )
-
-    # プライバシーコマンド: エクスポート
-    if message in ["/export", "エクスポート", "export"]:
-        return MessageClassification(
-            is_command=True,
-            command_type="export",
-            is_empty=False,
-            should_counsel=False,
-        )
-
-    # プライバシーコマンド: データ削除
-    if message in ["/clear_data", "/delete", "データ削除", "clear_data", "delete"]:
+    # コマンド判定（別名表を一度だけ引く）
+    command_type = COMMAND_ALIASES.get(message)
+    if command_type is not None:
         return MessageClassification(
             is_command=True,
-            command_type="clear_data",
+            command_type=command_type,
             is_empty=False,
             should_counsel=False,
         )
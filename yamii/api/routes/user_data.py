@@ -71,7 +71,7 @@ async def save_user_blob(
         nonce=body.nonce,
     )
 
-    logger.info(f"Saved encrypted blob for user: {user_id}")
+    logger.info("Saved encrypted blob for user: %s", user_id)
 
     return {"status": "ok"}
 
@@ -119,7 +119,7 @@ async def delete_user_blob(
     deleted = await storage.delete_blob(user_id)
 
     if deleted:
-        logger.info(f"Deleted blob for user: {user_id}")
+        logger.info("Deleted blob for user: %s", user_id)
         return {"status": "ok", "deleted": True}
     else:
         return {"status": "ok", "deleted": False}
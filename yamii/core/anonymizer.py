@@ -6,8 +6,84 @@ OpenAIに送信前に個人情報をマスクし、応答後に復元する
 from __future__ import annotations
 
 import re
+from collections import defaultdict
 from dataclasses import dataclass
 
+# 匿名化プレースホルダー: [PHONE_1] 等
+_PLACEHOLDER_PATTERN = re.compile(r"\[[A-Z]+_\d+\]")
+
+# PIIパターン定義（優先度順）
+# パターンはインポート時に一度だけコンパイルし、全インスタンスで共有する
+_PII_PATTERNS: tuple[tuple[str, str, re.Pattern], ...] = (
+    # マイナンバー（12桁）
+    (
+        "MYNUMBER",
+        "マイナンバー",
+        re.compile(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"),
+    ),
+    # クレジットカード（16桁）
+    (
+        "CARD",
+        "カード番号",
+        re.compile(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"),
+    ),
+    # 電話番号（携帯・固定）
+    (
+        "PHONE",
+        "電話番号",
+        re.compile(
+            r"(?:0\d{1,4}[-\s]?\d{1,4}[-\s]?\d{3,4}|\d{3}[-\s]?\d{4}[-\s]?\d{4})"
+        ),
+    ),
+    # メールアドレス
+    (
+        "EMAIL",
+        "メール",
+        re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"),
+    ),
+    # 生年月日（様々な形式）
+    (
+        "BIRTHDAY",
+        "生年月日",
+        re.compile(r"(?:19|20)\d{2}[-/年]\d{1,2}[-/月]\d{1,2}日?"),
+    ),
+    # 郵便番号
+    ("ZIPCODE", "郵便番号", re.compile(r"〒?\d{3}[-]?\d{4}")),
+    # 住所（都道府県から始まる）
+    (
+        "ADDRESS",
+        "住所",
+        re.compile(
+            r"(?:東京都|北海道|(?:京都|大阪)府|.{2,3}県)[^\s。、]+?(?:\d+[-ー]\d+[-ー]?\d*|丁目|番地?|号)"
+        ),
+    ),
+)
+
+# 日本人名パターン（姓名の組み合わせ）
+_NAME_PATTERNS: tuple[re.Pattern, ...] = (
+    # 「〜さん」「〜様」「〜君」「〜ちゃん」で終わる名前
+    re.compile(
+        r"([一-龯ぁ-んァ-ン]{1,4})\s*([一-龯ぁ-んァ-ン]{1,4})\s*(?:さん|様|君|ちゃん|先生|氏)"
+    ),
+    # 「私は〜です」パターン
+    re.compile(
+        r"(?:私は|僕は|俺は|名前は)\s*([一-龯ぁ-んァ-ン]{2,8})(?:です|と申します|といいます)"
+    ),
+)
+
+# 1パスで走査できるよう各パターンを1つの選択正規表現に結合
+# （同じ位置で複数がマッチする場合は優先度順の先頭が採用される）
+_COMBINED_PATTERN = re.compile(
+    "|".join(f"(?P<{tag}>{pattern.pattern})" for tag, _, pattern in _PII_PATTERNS)
+)
+_COMBINED_NAME_PATTERN = re.compile(
+    "|".join(pattern.pattern for pattern in _NAME_PATTERNS)
+)
+
+# 名前パターンが必ず含む固定文字列（敬称・名乗りの前置き）
+# 文字クラスの走査はバックトラックが多いため、先にこれで事前判定する
+_NAME_ANCHOR_PATTERN = re.compile("さん|様|君|ちゃん|先生|氏|私は|僕は|俺は|名前は")
+
 
 @dataclass
 class AnonymizationResult:
@@ -33,63 +109,27 @@ class PIIAnonymizer:
     """
 
     def __init__(self):
-        # PIIパターン定義（優先度順）
-        self._patterns: list[tuple[str, str, re.Pattern]] = [
-            # マイナンバー（12桁）
-            (
-                "MYNUMBER",
-                "マイナンバー",
-                re.compile(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"),
-            ),
-            # クレジットカード（16桁）
-            (
-                "CARD",
-                "カード番号",
-                re.compile(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"),
-            ),
-            # 電話番号（携帯・固定）
-            (
-                "PHONE",
-                "電話番号",
-                re.compile(
-                    r"(?:0\d{1,4}[-\s]?\d{1,4}[-\s]?\d{3,4}|\d{3}[-\s]?\d{4}[-\s]?\d{4})"
-                ),
-            ),
-            # メールアドレス
-            (
-                "EMAIL",
-                "メール",
-                re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"),
-            ),
-            # 生年月日（様々な形式）
-            (
-                "BIRTHDAY",
-                "生年月日",
-                re.compile(r"(?:19|20)\d{2}[-/年]\d{1,2}[-/月]\d{1,2}日?"),
-            ),
-            # 郵便番号
-            ("ZIPCODE", "郵便番号", re.compile(r"〒?\d{3}[-]?\d{4}")),
-            # 住所（都道府県から始まる）
-            (
-                "ADDRESS",
-                "住所",
-                re.compile(
-                    r"(?:東京都|北海道|(?:京都|大阪)府|.{2,3}県)[^\s。、]+?(?:\d+[-ー]\d+[-ー]?\d*|丁目|番地?|号)"
-                ),
-            ),
-        ]
-
-        # 日本人名パターン（姓名の組み合わせ）
-        self._name_patterns = [
-            # 「〜さん」「〜様」「〜君」「〜ちゃん」で終わる名前
-            re.compile(
-                r"([一-龯ぁ-んァ-ン]{1,4})\s*([一-龯ぁ-んァ-ン]{1,4})\s*(?:さん|様|君|ちゃん|先生|氏)"
-            ),
-            # 「私は〜です」パターン
-            re.compile(
-                r"(?:私は|僕は|俺は|名前は)\s*([一-龯ぁ-んァ-ン]{2,8})(?:です|と申します|といいます)"
-            ),
-        ]
+        # モジュールで共有するコンパイル済みパターンを参照
+        self._patterns = _PII_PATTERNS
+        self._name_patterns = _NAME_PATTERNS
+        self._combined = _COMBINED_PATTERN
+        self._combined_names = _COMBINED_NAME_PATTERN
+        self._name_anchor = _NAME_ANCHOR_PATTERN
+
+    def _replace(
+        self,
+        match: re.Match,
+        pii_type: str,
+        mapping: dict[str, str],
+        counters: defaultdict[str, int],
+    ) -> str:
+        """マッチをプレースホルダーに置換し、マッピングに記録"""
+        original = match.group()
+        counters[pii_type] += 1
+        placeholder = f"[{pii_type}_{counters[pii_type]}]"
+
+        mapping[placeholder] = original
+        return placeholder
 
     def anonymize(self, text: str) -> AnonymizationResult:
         """
@@ -101,45 +141,44 @@ class PIIAnonymizer:
         Returns:
             AnonymizationResult: 匿名化されたテキストとマッピング
         """
+        return self._anonymize(text, defaultdict(int))
+
+    def anonymize_batch(self, texts: list[str]) -> list[AnonymizationResult]:
+        """
+        複数のテキストをまとめて匿名化
+
+        プレースホルダーの連番はバッチ全体で共有するため、
+        各結果のマッピングを統合しても衝突しない。
+
+        Args:
+            texts: 元のテキストのリスト
+
+        Returns:
+            list[AnonymizationResult]: テキストごとの匿名化結果
+        """
+        counters: defaultdict[str, int] = defaultdict(int)
+        return [self._anonymize(text, counters) for text in texts]
+
+    def _anonymize(
+        self, text: str, counters: defaultdict[str, int]
+    ) -> AnonymizationResult:
+        """指定したカウンターで連番を振りながらテキストを匿名化"""
         mapping: dict[str, str] = {}
-        anonymized = text
-        counters: dict[str, int] = {}
-
-        # 標準PIIパターンの処理
-        for pii_type, _, pattern in self._patterns:
-            matches = list(pattern.finditer(anonymized))
-            for match in reversed(matches):  # 後ろから置換（位置ずれ防止）
-                original = match.group()
-                counter = counters.get(pii_type, 0) + 1
-                counters[pii_type] = counter
-                placeholder = f"[{pii_type}_{counter}]"
-
-                mapping[placeholder] = original
-                anonymized = (
-                    anonymized[: match.start()]
-                    + placeholder
-                    + anonymized[match.end() :]
-                )
+
+        # 標準PIIパターンの処理（グループ名からPII種別を判定）
+        anonymized = self._combined.sub(
+            lambda m: self._replace(m, m.lastgroup, mapping, counters), text
+        )
 
         # 名前パターンの処理
-        for pattern in self._name_patterns:
-            matches = list(pattern.finditer(anonymized))
-            for match in reversed(matches):
-                original = match.group()
-                # 既にプレースホルダーが含まれている場合はスキップ
-                if "[" in original:
-                    continue
-
-                counter = counters.get("NAME", 0) + 1
-                counters["NAME"] = counter
-                placeholder = f"[NAME_{counter}]"
-
-                mapping[placeholder] = original
-                anonymized = (
-                    anonymized[: match.start()]
-                    + placeholder
-                    + anonymized[match.end() :]
-                )
+        def replace_name(match: re.Match) -> str:
+            # 既にプレースホルダーが含まれている場合はスキップ
+            if "[" in match.group():
+                return match.group()
+            return self._replace(match, "NAME", mapping, counters)
+
+        if self._name_anchor.search(anonymized):
+            anonymized = self._combined_names.sub(replace_name, anonymized)
 
         return AnonymizationResult(
             anonymized_text=anonymized,
@@ -158,10 +197,10 @@ class PIIAnonymizer:
         Returns:
             str: 復元されたテキスト
         """
-        result = text
-        for placeholder, original in mapping.items():
-            result = result.replace(placeholder, original)
-        return result
+        # 全プレースホルダーを一度の走査で置換（未知のものはそのまま残す）
+        return _PLACEHOLDER_PATTERN.sub(
+            lambda m: mapping.get(m.group(), m.group()), text
+        )
 
 
 # グローバルインスタンス
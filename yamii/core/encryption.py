@@ -7,19 +7,30 @@ PyNaClとcryptographyを活用したゼロナレッジアーキテクチャ
 from __future__ import annotations
 
 import base64
+import json
 import logging
+import struct
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
+import nacl.bindings
 import nacl.secret
 import nacl.utils
-from nacl.public import Box, PrivateKey, PublicKey
+from nacl.public import PrivateKey
 
 logger = logging.getLogger(__name__)
 
+# バイナリ形式のヘッダー（暗号文長・nonce長、ネットワークバイトオーダー）
+_BINARY_HEADER = struct.Struct("!II")
 
-@dataclass
+
+def _to_bytes(data: str | bytes) -> bytes:
+    """暗号化対象をバイト列に変換（既に bytes の場合はエンコードしない）"""
+    return data if isinstance(data, bytes) else data.encode("utf-8")
+
+
+@dataclass(slots=True)
 class EncryptedData:
     """暗号化されたデータの構造"""
 
@@ -37,13 +48,56 @@ class EncryptedData:
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> EncryptedData:
-        """辞書から復元"""
+        """辞書から復元（不正なBase64文字は黙って捨てずにエラーにする）"""
         return cls(
-            ciphertext=base64.b64decode(data["ciphertext"]),
-            nonce=base64.b64decode(data["nonce"]),
+            ciphertext=base64.b64decode(data["ciphertext"], validate=True),
+            nonce=base64.b64decode(data["nonce"], validate=True),
             metadata=data["metadata"],
         )
 
+    def to_bytes(self) -> bytes:
+        """
+        バイナリ形式に変換（BLOB保存用）
+
+        Base64を経由せず、ヘッダー + 暗号文 + nonce + メタデータ(JSON) の順に連結する。
+        """
+        metadata = json.dumps(
+            self.metadata, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        return b"".join(
+            (
+                _BINARY_HEADER.pack(len(self.ciphertext), len(self.nonce)),
+                self.ciphertext,
+                self.nonce,
+                metadata,
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> EncryptedData:
+        """
+        バイナリ形式から復元
+
+        Raises:
+            ValueError: データが途中で切れている、またはメタデータが不正な場合
+        """
+        if len(data) < _BINARY_HEADER.size:
+            raise ValueError("暗号化データが途中で切れています")
+        ciphertext_len, nonce_len = _BINARY_HEADER.unpack_from(data)
+        view = memoryview(data)
+        offset = _BINARY_HEADER.size
+        ciphertext = bytes(view[offset : offset + ciphertext_len])
+        offset += ciphertext_len
+        nonce = bytes(view[offset : offset + nonce_len])
+        offset += nonce_len
+        if len(ciphertext) != ciphertext_len or len(nonce) != nonce_len:
+            raise ValueError("暗号化データが途中で切れています")
+        return cls(
+            ciphertext=ciphertext,
+            nonce=nonce,
+            metadata=json.loads(view[offset:].tobytes().decode("utf-8")),
+        )
+
 
 class E2EECrypto:
     """
@@ -81,42 +135,33 @@ class E2EECrypto:
             self.logger.error(f"キーペア生成エラー: {e}")
             raise
 
-    def encrypt(self, plaintext: str, public_key: bytes) -> EncryptedData:
+    def encrypt(self, plaintext: str | bytes, public_key: bytes) -> EncryptedData:
         """
         テキストを公開鍵で暗号化
 
         Args:
-            plaintext: 暗号化するテキスト
+            plaintext: 暗号化するテキスト（bytes の場合はそのまま暗号化）
             public_key: 受信者の公開鍵
 
         Returns:
             EncryptedData: 暗号化されたデータ
         """
         try:
-            # 公開鍵を復元
-            recipient_public_key = PublicKey(public_key)
-
             # 送信者の一時キーペア生成（前方秘匿性）
-            sender_private_key = PrivateKey.generate()
-
-            # BoxでE2EE暗号化
-            box = Box(sender_private_key, recipient_public_key)
-
-            # プレインテキストをUTF-8でエンコード
-            plaintext_bytes = plaintext.encode("utf-8")
-
-            # 暗号化（nonceは自動生成される）
-            encrypted = box.encrypt(plaintext_bytes)
+            sender_public_key, sender_private_key = nacl.bindings.crypto_box_keypair()
 
-            # 暗号化データから成分を分離
-            nonce = encrypted.nonce
-            ciphertext = encrypted.ciphertext
+            # libsodiumのcrypto_boxを直接呼び出してE2EE暗号化
+            # （Box・EncryptedMessageのラッパーオブジェクトを経由しない）
+            nonce = nacl.utils.random(nacl.bindings.crypto_box_NONCEBYTES)
+            ciphertext = nacl.bindings.crypto_box(
+                _to_bytes(plaintext), nonce, public_key, sender_private_key
+            )
 
             # メタデータ
             metadata = {
-                "sender_public_key": base64.b64encode(
-                    sender_private_key.public_key.encode()
-                ).decode("utf-8"),
+                "sender_public_key": base64.b64encode(sender_public_key).decode(
+                    "utf-8"
+                ),
                 "algorithm": "nacl.Box",
                 "version": "1.0",
                 "timestamp": datetime.now().isoformat(),
@@ -128,40 +173,36 @@ class E2EECrypto:
             self.logger.error(f"暗号化エラー: {e}")
             raise
 
-    def decrypt(self, encrypted_data: EncryptedData, private_key: bytes) -> str:
+    def decrypt(
+        self, encrypted_data: EncryptedData, private_key: bytes, as_bytes: bool = False
+    ) -> str | bytes:
         """
         暗号化データを秘密鍵で復号
 
         Args:
             encrypted_data: 暗号化されたデータ
             private_key: 受信者の秘密鍵
+            as_bytes: True の場合はUTF-8デコードせず bytes のまま返す
 
         Returns:
-            str: 復号されたテキスト
+            str | bytes: 復号されたテキスト
         """
         try:
-            # 秘密鍵を復元
-            recipient_private_key = PrivateKey(private_key)
-
             # 送信者の公開鍵を取得
-            sender_public_key_bytes = base64.b64decode(
-                encrypted_data.metadata["sender_public_key"]
+            sender_public_key = base64.b64decode(
+                encrypted_data.metadata["sender_public_key"], validate=True
             )
-            sender_public_key = PublicKey(sender_public_key_bytes)
-
-            # Boxで復号
-            box = Box(recipient_private_key, sender_public_key)
-
-            # 暗号化データを復元
-            from nacl.utils import EncryptedMessage
 
-            # PyNaClのEncryptedMessageは nonce + ciphertext の順序
-            encrypted_message = EncryptedMessage(
-                encrypted_data.nonce + encrypted_data.ciphertext
+            # nonce と暗号文を連結せず、それぞれ直接渡して復号
+            decrypted_bytes = nacl.bindings.crypto_box_open(
+                encrypted_data.ciphertext,
+                encrypted_data.nonce,
+                sender_public_key,
+                private_key,
             )
 
-            # 復号
-            decrypted_bytes = box.decrypt(encrypted_message)
+            if as_bytes:
+                return decrypted_bytes
 
             # UTF-8でデコード
             return decrypted_bytes.decode("utf-8")
@@ -179,26 +220,29 @@ class E2EECrypto:
         """
         return nacl.utils.random(nacl.secret.SecretBox.KEY_SIZE)
 
-    def encrypt_large_data(self, data: str, symmetric_key: bytes) -> EncryptedData:
+    def encrypt_large_data(
+        self, data: str | bytes, symmetric_key: bytes
+    ) -> EncryptedData:
         """
         大きなデータを対称鍵で暗号化
 
         Args:
-            data: 暗号化するデータ
+            data: 暗号化するデータ（bytes の場合はそのまま暗号化）
             symmetric_key: 対称鍵
 
         Returns:
             EncryptedData: 暗号化されたデータ
         """
         try:
-            # SecretBoxで高速対称暗号化
-            secret_box = nacl.secret.SecretBox(symmetric_key)
-
-            # データをUTF-8でエンコード
-            data_bytes = data.encode("utf-8")
-
-            # 暗号化
-            encrypted = secret_box.encrypt(data_bytes)
+            # データをUTF-8でエンコード（bytes の場合は不要）
+            data_bytes = _to_bytes(data)
+
+            # libsodiumのcrypto_secretboxを直接呼び出して暗号化
+            # （鍵ごとのSecretBoxオブジェクトを生成・保持しない）
+            nonce = nacl.utils.random(nacl.bindings.crypto_secretbox_NONCEBYTES)
+            ciphertext = nacl.bindings.crypto_secretbox(
+                data_bytes, nonce, symmetric_key
+            )
 
             metadata = {
                 "algorithm": "nacl.SecretBox",
@@ -206,43 +250,37 @@ class E2EECrypto:
                 "size": len(data_bytes),
             }
 
-            return EncryptedData(
-                ciphertext=encrypted.ciphertext,
-                nonce=encrypted.nonce,
-                metadata=metadata,
-            )
+            return EncryptedData(ciphertext=ciphertext, nonce=nonce, metadata=metadata)
 
         except Exception as e:
             self.logger.error(f"対称暗号化エラー: {e}")
             raise
 
     def decrypt_large_data(
-        self, encrypted_data: EncryptedData, symmetric_key: bytes
-    ) -> str:
+        self,
+        encrypted_data: EncryptedData,
+        symmetric_key: bytes,
+        as_bytes: bool = False,
+    ) -> str | bytes:
         """
         対称鍵で暗号化されたデータを復号
 
         Args:
             encrypted_data: 暗号化されたデータ
             symmetric_key: 対称鍵
+            as_bytes: True の場合はUTF-8デコードせず bytes のまま返す
 
         Returns:
-            str: 復号されたデータ
+            str | bytes: 復号されたデータ
         """
         try:
-            # SecretBoxで復号
-            secret_box = nacl.secret.SecretBox(symmetric_key)
-
-            # EncryptedMessageを復元
-            from nacl.utils import EncryptedMessage
-
-            # PyNaClのEncryptedMessageは nonce + ciphertext の順序
-            encrypted_message = EncryptedMessage(
-                encrypted_data.nonce + encrypted_data.ciphertext
+            # nonce と暗号文を連結せず、それぞれ直接渡して復号
+            decrypted_bytes = nacl.bindings.crypto_secretbox_open(
+                encrypted_data.ciphertext, encrypted_data.nonce, symmetric_key
             )
 
-            # 復号
-            decrypted_bytes = secret_box.decrypt(encrypted_message)
+            if as_bytes:
+                return decrypted_bytes
 
             return decrypted_bytes.decode("utf-8")
 
@@ -256,7 +294,7 @@ class E2EECrypto:
 
     def key_from_base64(self, key_str: str) -> bytes:
         """Base64文字列からキーを復元"""
-        return base64.b64decode(key_str)
+        return base64.b64decode(key_str, validate=True)
 
 
 # グローバルインスタンス
@@ -2,7 +2,7 @@
 プライバシーファースト: セキュアなキー管理システム
 
 - ユーザーごとの暗号化キー派生
-- マスターキーからユーザーキーを安全に導出
+- マスターキーからユーザーキーを安全に導出（HKDF-SHA256）
 - キーローテーション対応
 """
 
@@ -10,6 +10,7 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import hmac
 import os
 from dataclasses import dataclass
 from datetime import datetime
@@ -20,7 +21,23 @@ import nacl.utils
 from nacl.pwhash import argon2id
 
 
-@dataclass
+def _hkdf_sha256(key: bytes, salt: bytes, info: bytes, length: int) -> bytes:
+    """HKDF-SHA256（RFC 5869）で鍵を導出"""
+    # Extract: 入力鍵素材から擬似ランダム鍵を生成
+    prk = hmac.digest(salt, key, "sha256")
+
+    # Expand: 必要な長さまで出力を伸長
+    output = b""
+    block = b""
+    counter = 1
+    while len(output) < length:
+        block = hmac.digest(prk, block + info + bytes([counter]), "sha256")
+        output += block
+        counter += 1
+    return output[:length]
+
+
+@dataclass(slots=True, frozen=True)
 class DerivedKey:
     """派生されたユーザーキー"""
 
@@ -36,12 +53,13 @@ class SecureKeyManager:
 
     プライバシーファースト原則:
     - マスターキーからユーザーごとの暗号化キーを派生
-    - Argon2idによるメモリハード関数でブルートフォース耐性
+    - マスターキーは256ビットの乱数のため、パスワード向けの
+      メモリハード関数ではなくHKDF-SHA256で派生する
     - キーは絶対にログ出力しない
     - メモリからのキー消去を可能な限り実行
     """
 
-    # Argon2idパラメータ（セキュリティ重視）
+    # 旧形式（v2.0以前）のArgon2idパラメータ（既存データの復号用）
     OPSLIMIT = argon2id.OPSLIMIT_MODERATE
     MEMLIMIT = argon2id.MEMLIMIT_MODERATE
 
@@ -59,32 +77,58 @@ class SecureKeyManager:
         # 環境変数から取得（推奨: Secrets Manager経由で注入）
         env_key = os.environ.get("YAMII_MASTER_KEY")
         if env_key:
-            return base64.b64decode(env_key)
+            # 前後の空白・改行は許容し、それ以外の不正な文字はエラーにする
+            return base64.b64decode(env_key.strip(), validate=True)
 
         # ファイルから取得
-        if self._key_file.exists():
+        stored_key = self._read_key_file()
+        if stored_key is not None:
+            return stored_key
+
+        # 新規生成（32バイト = 256ビット）
+        new_key = nacl.utils.random(nacl.secret.SecretBox.KEY_SIZE)
+        self._write_key_file(new_key)
+
+        return new_key
+
+    def _read_key_file(self) -> bytes | None:
+        """
+        マスターキーをファイルから読み込み（ファイルがなければNone）
+
+        存在確認・パーミッション確認・読み込みを同じファイル記述子で行い、
+        確認後にファイルが差し替えられる余地をなくす。
+        """
+        try:
+            fd = os.open(self._key_file, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+
+        try:
             # パーミッション確認
-            mode = self._key_file.stat().st_mode & 0o777
+            mode = os.fstat(fd).st_mode & 0o777
             if mode != 0o600:
                 raise PermissionError(
                     f"マスターキーファイルのパーミッションが危険です: {oct(mode)}。0o600にしてください。"
                 )
-            with open(self._key_file, encoding="utf-8") as f:
-                return base64.b64decode(f.read().strip())
+            # キーファイルはBase64の1行のみ（数十バイト）
+            content = os.read(fd, 4096)
+        finally:
+            os.close(fd)
 
-        # 新規生成（32バイト = 256ビット）
-        new_key = nacl.utils.random(nacl.secret.SecretBox.KEY_SIZE)
+        return base64.b64decode(content.strip(), validate=True)
 
-        # 安全なファイル書き込み（umaskを一時的に変更）
-        old_umask = os.umask(0o077)
-        try:
-            with open(self._key_file, "w", encoding="utf-8") as f:
-                f.write(base64.b64encode(new_key).decode("utf-8"))
-            os.chmod(self._key_file, 0o600)
-        finally:
-            os.umask(old_umask)
+    def _write_key_file(self, key: bytes) -> None:
+        """
+        マスターキーをファイルに安全に書き込み
 
-        return new_key
+        作成時点から0o600で開くため、他ユーザーから読める瞬間がない。
+        プロセス全体のumaskも変更しない。
+        """
+        fd = os.open(self._key_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # 既存ファイルを上書きする場合もパーミッションを0o600に揃える
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(base64.b64encode(key))
 
     def derive_user_key(self, user_id: str, context: str = "user_data") -> bytes:
         """
@@ -103,16 +147,14 @@ class SecureKeyManager:
             return self._derived_keys[cache_key].key
 
         # ユーザーID + コンテキスト から salt を生成
-        salt_input = f"yamii:{user_id}:{context}".encode()
-        salt = hashlib.sha256(salt_input).digest()[:16]  # 16バイト salt
+        salt = hashlib.sha256(f"yamii:{user_id}:{context}".encode()).digest()
 
-        # Argon2idでキー派生
-        derived = argon2id.kdf(
-            size=nacl.secret.SecretBox.KEY_SIZE,
-            password=self._master_key,
+        # HKDF-SHA256でキー派生（用途ごとに info で鍵を分離）
+        derived = _hkdf_sha256(
+            self._master_key,
             salt=salt,
-            opslimit=self.OPSLIMIT,
-            memlimit=self.MEMLIMIT,
+            info=f"yamii:{context}".encode(),
+            length=nacl.secret.SecretBox.KEY_SIZE,
         )
 
         # キーIDを生成（ローテーション追跡用）
@@ -127,6 +169,24 @@ class SecureKeyManager:
 
         return derived
 
+    def derive_legacy_user_key(self, user_id: str, context: str = "user_data") -> bytes:
+        """
+        旧形式（Argon2id）のユーザーキーを派生
+
+        HKDF移行前に暗号化されたデータの復号にのみ使用する。
+        移行時に一度だけ使うためキャッシュしない。
+        """
+        salt_input = f"yamii:{user_id}:{context}".encode()
+        salt = hashlib.sha256(salt_input).digest()[:16]  # 16バイト salt
+
+        return argon2id.kdf(
+            size=nacl.secret.SecretBox.KEY_SIZE,
+            password=self._master_key,
+            salt=salt,
+            opslimit=self.OPSLIMIT,
+            memlimit=self.MEMLIMIT,
+        )
+
     def derive_conversation_key(self, user_id: str, session_id: str) -> bytes:
         """
         会話ごとの暗号化キーを派生（前方秘匿性）
@@ -153,13 +213,7 @@ class SecureKeyManager:
         self._derived_keys.clear()  # 派生キーキャッシュをクリア
 
         # 新しいキーをファイルに保存
-        old_umask = os.umask(0o077)
-        try:
-            with open(self._key_file, "w", encoding="utf-8") as f:
-                f.write(base64.b64encode(new_key).decode("utf-8"))
-            os.chmod(self._key_file, 0o600)
-        finally:
-            os.umask(old_umask)
+        self._write_key_file(new_key)
 
         return old_key, new_key
 
@@ -9,11 +9,41 @@ import json
 import logging
 import os
 import sys
-from datetime import datetime
+import time
 from typing import Any
 
 from .exceptions import YamiiException
 
+# ログ出力用JSONエンコーダー（json.dumps は呼び出しごとに生成するため使い回す）
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+# LogRecordの標準属性（カスタム属性の抽出時に除外する）
+_RESERVED_RECORD_KEYS = frozenset(
+    (
+        "name",
+        "msg",
+        "args",
+        "levelname",
+        "levelno",
+        "pathname",
+        "filename",
+        "module",
+        "lineno",
+        "funcName",
+        "created",
+        "msecs",
+        "relativeCreated",
+        "thread",
+        "threadName",
+        "processName",
+        "process",
+        "getMessage",
+        "exc_info",
+        "exc_text",
+        "stack_info",
+    )
+)
+
 
 def _get_log_level() -> str:
     """環境変数からログレベルを取得"""
@@ -28,50 +58,46 @@ def _is_debug_mode() -> bool:
 class StructuredFormatter(logging.Formatter):
     """構造化ログフォーマッター"""
 
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # 秒単位のタイムスタンプ文字列のキャッシュ（同一秒内のログで再利用）
+        self._cached_second = -1
+        self._cached_prefix = ""
+
+    def _format_timestamp(self, created: float) -> str:
+        """
+        ログ発生時刻をUTCのISO 8601形式に整形
+
+        datetime を生成せず、秒までの部分を秒が変わったときだけ整形する。
+        """
+        second = int(created)
+        if second != self._cached_second:
+            self._cached_prefix = time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.gmtime(second)
+            )
+            self._cached_second = second
+        microsecond = int((created - second) * 1_000_000)
+        return f"{self._cached_prefix}.{microsecond:06d}Z"
+
     def format(self, record: logging.LogRecord) -> str:
         # ベース情報
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
+            # モジュール情報（LogRecord が常に持つ属性）
+            "file": record.filename,
+            "line": record.lineno,
+            "function": record.funcName,
         }
 
-        # モジュール情報
-        if hasattr(record, "filename"):
-            log_entry["file"] = record.filename
-        if hasattr(record, "lineno"):
-            log_entry["line"] = record.lineno
-        if hasattr(record, "funcName"):
-            log_entry["function"] = record.funcName
-
         # カスタム属性の追加
-        extra_fields = {}
-        for key, value in record.__dict__.items():
-            if key not in [
-                "name",
-                "msg",
-                "args",
-                "levelname",
-                "levelno",
-                "pathname",
-                "filename",
-                "module",
-                "lineno",
-                "funcName",
-                "created",
-                "msecs",
-                "relativeCreated",
-                "thread",
-                "threadName",
-                "processName",
-                "process",
-                "getMessage",
-                "exc_info",
-                "exc_text",
-                "stack_info",
-            ]:
-                extra_fields[key] = value
+        extra_fields = {
+            key: value
+            for key, value in record.__dict__.items()
+            if key not in _RESERVED_RECORD_KEYS
+        }
 
         if extra_fields:
             log_entry["extra"] = extra_fields
@@ -88,7 +114,7 @@ class StructuredFormatter(logging.Formatter):
                 log_entry["exception"]["error_code"] = record.exc_info[1].error_code
                 log_entry["exception"]["details"] = record.exc_info[1].details
 
-        return json.dumps(log_entry, ensure_ascii=False, separators=(",", ":"))
+        return _JSON_ENCODER.encode(log_entry)
 
 
 class YamiiLogger:
@@ -120,14 +146,16 @@ class YamiiLogger:
     @classmethod
     def get_logger(cls, name: str) -> logging.Logger:
         """ログインスタンスを取得"""
+        # 取得済みのロガーは辞書の参照1回で返す（取得時点で設定済み）
+        logger = cls._loggers.get(name)
+        if logger is not None:
+            return logger
+
         if not cls._configured:
             cls.configure()
 
-        if name not in cls._loggers:
-            logger_name = f"yamii.{name}" if not name.startswith("yamii.") else name
-            cls._loggers[name] = logging.getLogger(logger_name)
-
-        return cls._loggers[name]
+        logger_name = f"yamii.{name}" if not name.startswith("yamii.") else name
+        return cls._loggers.setdefault(name, logging.getLogger(logger_name))
 
 
 # 便利関数群
@@ -140,8 +168,14 @@ def log_request(
     logger: logging.Logger, user_id: str, endpoint: str, method: str = "POST", **kwargs
 ):
     """リクエストログ"""
+    # 出力されないレベルではメッセージ・extra辞書を組み立てない
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
     logger.info(
-        f"Request received: {method} {endpoint}",
+        "Request received: %s %s",
+        method,
+        endpoint,
         extra={
             "event_type": "request",
             "user_id": user_id,
@@ -161,8 +195,12 @@ def log_response(
     **kwargs,
 ):
     """レスポンスログ"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
     logger.info(
-        f"Response sent: {status_code}",
+        "Response sent: %s",
+        status_code,
         extra={
             "event_type": "response",
             "user_id": user_id,
@@ -178,20 +216,26 @@ def log_error(
     logger: logging.Logger, error: Exception, context: dict[str, Any] | None = None
 ):
     """エラーログ"""
+    if not logger.isEnabledFor(logging.ERROR):
+        return
+
     extra_info = {"event_type": "error"}
     if context:
         extra_info.update(context)
 
-    logger.error(f"Error occurred: {str(error)}", exc_info=True, extra=extra_info)
+    logger.error("Error occurred: %s", error, exc_info=True, extra=extra_info)
 
 
 def log_business_event(
     logger: logging.Logger, event: str, user_id: str | None = None, **kwargs
 ):
     """ビジネスイベントログ"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
     extra_info = {"event_type": "business_event", "business_event": event}
     if user_id:
         extra_info["user_id"] = user_id
     extra_info.update(kwargs)
 
-    logger.info(f"Business event: {event}", extra=extra_info)
+    logger.info("Business event: %s", event, extra=extra_info)
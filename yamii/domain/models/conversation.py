@@ -3,12 +3,17 @@
 エピソード（長期記憶）、メッセージ、会話コンテキストを定義
 """
 
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
 from .emotion import EmotionType
+from .timestamps import cached_isoformat, parse_datetime
+
+# 会話コンテキストに保持する直近メッセージ数
+MAX_RECENT_MESSAGES = 20
 
 
 class EpisodeType(Enum):
@@ -29,7 +34,7 @@ class ConversationPhase(Enum):
     CLOSING = "closing"  # 終了
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """個別メッセージ"""
 
@@ -40,12 +45,18 @@ class Message:
     emotion: EmotionType | None = None
     emotion_intensity: float = 0.0
 
+    # timestamp の ISO 文字列キャッシュ（コンテキストの繰り返し保存で再計算しない）
+    _timestamp_iso: tuple[datetime, str] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     def to_dict(self) -> dict[str, Any]:
+        self._timestamp_iso = cached_isoformat(self.timestamp, self._timestamp_iso)
         return {
             "id": self.id,
             "role": self.role,
             "content": self.content,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self._timestamp_iso[1],
             "emotion": self.emotion.value if self.emotion else None,
             "emotion_intensity": self.emotion_intensity,
         }
@@ -56,15 +67,13 @@ class Message:
             id=data["id"],
             role=data["role"],
             content=data["content"],
-            timestamp=datetime.fromisoformat(
-                data.get("timestamp", datetime.now().isoformat())
-            ),
+            timestamp=parse_datetime(data.get("timestamp")),
             emotion=EmotionType(data["emotion"]) if data.get("emotion") else None,
             emotion_intensity=data.get("emotion_intensity", 0.0),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Episode:
     """
     エピソード記憶（長期記憶）
@@ -90,11 +99,17 @@ class Episode:
     # 検索用
     keywords: list[str] = field(default_factory=list)
 
+    # created_at の ISO 文字列キャッシュ（(元の datetime, 文字列)）
+    _created_at_iso: tuple[datetime, str] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     def to_dict(self) -> dict[str, Any]:
+        self._created_at_iso = cached_isoformat(self.created_at, self._created_at_iso)
         return {
             "id": self.id,
             "user_id": self.user_id,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self._created_at_iso[1],
             "summary": self.summary,
             "user_shared": self.user_shared,
             "emotional_context": self.emotional_context,
@@ -124,7 +139,7 @@ class Episode:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationContext:
     """
     会話コンテキスト（短期記憶）
@@ -145,23 +160,31 @@ class ConversationContext:
     emotion_stability: float = 1.0
 
     # 履歴（直近N件）
-    recent_messages: list[Message] = field(default_factory=list)
+    recent_messages: deque[Message] = field(
+        default_factory=lambda: deque(maxlen=MAX_RECENT_MESSAGES)
+    )
 
-    # 継続性
-    unresolved_questions: list[str] = field(default_factory=list)
+    # 継続性（未解決の質問は挿入順を保つ dict をセットとして使う）
+    unresolved_questions: dict[str, None] = field(default_factory=dict)
     pending_follow_ups: list[str] = field(default_factory=list)
 
     # タイムスタンプ
     started_at: datetime = field(default_factory=datetime.now)
     last_message_at: datetime = field(default_factory=datetime.now)
 
-    def add_message(self, message: Message) -> None:
+    def add_message(self, message: Message, now: datetime | None = None) -> None:
         """メッセージを追加"""
+        # maxlen 付きの deque なので、古いメッセージは自動的に押し出される
         self.recent_messages.append(message)
-        self.last_message_at = datetime.now()
-        # 最新20件を保持
-        if len(self.recent_messages) > 20:
-            self.recent_messages = self.recent_messages[-20:]
+        self.last_message_at = now or datetime.now()
+
+    def add_unresolved_question(self, question: str) -> None:
+        """未解決の質問を追加"""
+        self.unresolved_questions[question] = None
+
+    def resolve_question(self, question: str) -> None:
+        """質問を解決済みにする"""
+        self.unresolved_questions.pop(question, None)
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -173,8 +196,8 @@ class ConversationContext:
             "current_emotion": self.current_emotion.value,
             "emotion_intensity": self.emotion_intensity,
             "emotion_stability": self.emotion_stability,
-            "recent_messages": [m.to_dict() for m in self.recent_messages],
-            "unresolved_questions": self.unresolved_questions,
+            "recent_messages": list(map(Message.to_dict, self.recent_messages)),
+            "unresolved_questions": list(self.unresolved_questions),
             "pending_follow_ups": self.pending_follow_ups,
             "started_at": self.started_at.isoformat(),
             "last_message_at": self.last_message_at.isoformat(),
@@ -191,15 +214,12 @@ class ConversationContext:
             current_emotion=EmotionType(data.get("current_emotion", "neutral")),
             emotion_intensity=data.get("emotion_intensity", 0.0),
             emotion_stability=data.get("emotion_stability", 1.0),
-            recent_messages=[
-                Message.from_dict(m) for m in data.get("recent_messages", [])
-            ],
-            unresolved_questions=data.get("unresolved_questions", []),
-            pending_follow_ups=data.get("pending_follow_ups", []),
-            started_at=datetime.fromisoformat(
-                data.get("started_at", datetime.now().isoformat())
-            ),
-            last_message_at=datetime.fromisoformat(
-                data.get("last_message_at", datetime.now().isoformat())
+            recent_messages=deque(
+                (Message.from_dict(m) for m in data.get("recent_messages", [])),
+                maxlen=MAX_RECENT_MESSAGES,
             ),
+            unresolved_questions=dict.fromkeys(data.get("unresolved_questions", [])),
+            pending_follow_ups=data.get("pending_follow_ups", []),
+            started_at=parse_datetime(data.get("started_at")),
+            last_message_at=parse_datetime(data.get("last_message_at")),
         )
@@ -26,7 +26,7 @@ class EmotionType(Enum):
     NEUTRAL = "neutral"  # 中性・平常
 
 
-@dataclass
+@dataclass(slots=True)
 class EmotionAnalysis:
     """
     感情分析結果
@@ -38,7 +38,7 @@ class DepthLevel(Enum):
     DEEP = "deep"  # 深い（詳細な応答）
 
 
-@dataclass
+@dataclass(slots=True)
 class PhaseTransition:
     """フェーズ遷移記録"""
 
@@ -68,7 +68,7 @@ class PhaseTransition:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class TopicAffinity:
     """トピック関心度"""
 
@@ -89,11 +89,12 @@ class TopicAffinity:
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "TopicAffinity":
+        last_mentioned = data.get("last_mentioned")
         return cls(
             topic=data["topic"],
             affinity_score=data.get("affinity_score", 0.0),
             mention_count=data.get("mention_count", 0),
-            last_mentioned=datetime.fromisoformat(data["last_mentioned"])
-            if data.get("last_mentioned")
+            last_mentioned=datetime.fromisoformat(last_mentioned)
+            if last_mentioned
             else None,
         )
@@ -0,0 +1,27 @@
+"""
+日時ヘルパー
+ドメインモデルのシリアライズで共通して使う日時変換
+"""
+
+from datetime import datetime
+
+
+def parse_datetime(value: str | None, default: datetime | None = None) -> datetime:
+    """ISO形式の日時文字列をパース（欠損時はデフォルト値、未指定なら現在時刻）"""
+    if value:
+        return datetime.fromisoformat(value)
+    return default if default is not None else datetime.now()
+
+
+def cached_isoformat(
+    value: datetime, cached: tuple[datetime, str] | None
+) -> tuple[datetime, str]:
+    """
+    (datetime, ISO文字列) のキャッシュを返す
+
+    キャッシュ元と同じ datetime オブジェクトなら再フォーマットせず、
+    フィールドが差し替えられていれば再計算する。
+    """
+    if cached is None or cached[0] is not value:
+        return value, value.isoformat()
+    return cached
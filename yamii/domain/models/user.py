@@ -4,6 +4,7 @@ Zero-Knowledge対応ユーザー状態
 クライアント側で暗号化されてサーバーに保存される
 """
 
+import heapq
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
@@ -15,9 +16,10 @@ from .relationship import (
     ToneLevel,
     TopicAffinity,
 )
+from .timestamps import cached_isoformat, parse_datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class UserState:
     """
     Zero-Knowledge ユーザー状態
@@ -75,30 +77,57 @@ class UserState:
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
 
-    def update_interaction(self) -> None:
+    # 既知情報の重複チェック用セット（シリアライズしない）
+    # リストは挿入順の保持用。追加は add_known_fact / add_known_topic 経由で行う
+    _known_facts_set: set[str] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
+    _known_topics_set: set[str] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
+
+    # 生成後ほぼ変わらない日時の ISO 文字列キャッシュ（シリアライズしない）
+    _first_interaction_iso: tuple[datetime, str] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _created_at_iso: tuple[datetime, str] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self._known_facts_set = set(self.known_facts)
+        self._known_topics_set = set(self.known_topics)
+
+    def update_interaction(self, now: datetime | None = None) -> None:
         """インタラクションを記録"""
         self.total_interactions += 1
-        self.last_interaction = datetime.now()
-        self.updated_at = datetime.now()
+        # 最終対話時刻と更新時刻は同じ時刻にそろえる
+        now = now or datetime.now()
+        self.last_interaction = now
+        self.updated_at = now
 
     def add_known_fact(self, fact: str) -> None:
         """既知の事実を追加"""
-        if fact not in self.known_facts:
+        if fact not in self._known_facts_set:
+            self._known_facts_set.add(fact)
             self.known_facts.append(fact)
 
     def add_known_topic(self, topic: str) -> None:
         """話したトピックを追加"""
-        if topic not in self.known_topics:
+        if topic not in self._known_topics_set:
+            self._known_topics_set.add(topic)
             self.known_topics.append(topic)
 
-    def update_topic_affinity(self, topic: str, score_delta: float = 0.1) -> None:
+    def update_topic_affinity(
+        self, topic: str, score_delta: float = 0.1, now: datetime | None = None
+    ) -> None:
         """トピック関心度を更新"""
         if topic not in self.topic_affinities:
             self.topic_affinities[topic] = TopicAffinity(topic=topic)
 
         affinity = self.topic_affinities[topic]
         affinity.mention_count += 1
-        affinity.last_mentioned = datetime.now()
+        affinity.last_mentioned = now or datetime.now()
         affinity.affinity_score = min(1.0, affinity.affinity_score + score_delta)
 
     def update_emotional_pattern(self, emotion: str) -> None:
@@ -106,26 +135,29 @@ class UserState:
         self.emotional_patterns[emotion] = self.emotional_patterns.get(emotion, 0) + 1
 
     def get_top_topics(self, n: int = 5) -> list[TopicAffinity]:
-        """上位トピックを取得"""
-        sorted_topics = sorted(
+        """上位トピックを取得（全件ソートせず上位n件のみ選択）"""
+        return heapq.nlargest(
+            n,
             self.topic_affinities.values(),
             key=lambda t: t.affinity_score,
-            reverse=True,
         )
-        return sorted_topics[:n]
 
     def to_dict(self) -> dict[str, Any]:
+        self._first_interaction_iso = cached_isoformat(
+            self.first_interaction, self._first_interaction_iso
+        )
+        self._created_at_iso = cached_isoformat(self.created_at, self._created_at_iso)
         return {
             "user_id": self.user_id,
             # 関係性
             "phase": self.phase.value,
             "total_interactions": self.total_interactions,
-            "first_interaction": self.first_interaction.isoformat(),
+            "first_interaction": self._first_interaction_iso[1],
             "last_interaction": self.last_interaction.isoformat(),
             "trust_score": self.trust_score,
             "openness_score": self.openness_score,
             "rapport_score": self.rapport_score,
-            "phase_history": [p.to_dict() for p in self.phase_history],
+            "phase_history": list(map(PhaseTransition.to_dict, self.phase_history)),
             # 学習された好み
             "preferred_tone": self.preferred_tone.value,
             "preferred_depth": self.preferred_depth.value,
@@ -145,23 +177,21 @@ class UserState:
             "known_facts": self.known_facts,
             "known_topics": self.known_topics,
             # メタデータ
-            "created_at": self.created_at.isoformat(),
+            "created_at": self._created_at_iso[1],
             "updated_at": self.updated_at.isoformat(),
         }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "UserState":
+        # 欠損した日時の補完用（文字列化して再パースしない）
+        now = datetime.now()
         return cls(
             user_id=data["user_id"],
             # 関係性
             phase=RelationshipPhase(data.get("phase", "stranger")),
             total_interactions=data.get("total_interactions", 0),
-            first_interaction=datetime.fromisoformat(
-                data.get("first_interaction", datetime.now().isoformat())
-            ),
-            last_interaction=datetime.fromisoformat(
-                data.get("last_interaction", datetime.now().isoformat())
-            ),
+            first_interaction=parse_datetime(data.get("first_interaction"), now),
+            last_interaction=parse_datetime(data.get("last_interaction"), now),
             trust_score=data.get("trust_score", 0.0),
             openness_score=data.get("openness_score", 0.0),
             rapport_score=data.get("rapport_score", 0.0),
@@ -188,10 +218,6 @@ class UserState:
             known_facts=data.get("known_facts", []),
             known_topics=data.get("known_topics", []),
             # メタデータ
-            created_at=datetime.fromisoformat(
-                data.get("created_at", datetime.now().isoformat())
-            ),
-            updated_at=datetime.fromisoformat(
-                data.get("updated_at", datetime.now().isoformat())
-            ),
+            created_at=parse_datetime(data.get("created_at"), now),
+            updated_at=parse_datetime(data.get("updated_at"), now),
         )
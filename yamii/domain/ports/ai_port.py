@@ -8,7 +8,7 @@ from collections.abc import AsyncGenerator
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
     """チャットメッセージ"""
 
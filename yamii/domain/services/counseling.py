@@ -4,15 +4,17 @@
 """
 
 import os
+import re
 import uuid
 from collections.abc import AsyncGenerator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 from ..models.emotion import EmotionAnalysis, EmotionType
 from ..models.relationship import (
+    PhaseTransition,
     RelationshipPhase,
 )
 from ..models.user import UserState
@@ -30,25 +32,46 @@ if not CONFIG_DIR.is_absolute():
     CONFIG_DIR = Path(__file__).parent.parent.parent.parent / _config_dir_str
 DEFAULT_PROMPT_FILE = CONFIG_DIR / "YAMII.md"
 
+# アドバイス志向として学習するカテゴリ
+_ADVICE_ORIENTED_TYPES = frozenset({"career", "education", "health"})
+
+
+# 読み込み済みプロンプトのキャッシュ: ((パス, 更新時刻ns, サイズ), 内容)
+_prompt_cache: tuple[tuple[Path, int, int], str] | None = None
+
 
 def _load_prompt_from_file() -> str:
     """
     YAMII.mdからデフォルトプロンプトを読み込む
 
+    リクエストごとに呼ばれるため、ファイルのパス・更新時刻・サイズが
+    前回と同じであれば読み込み済みの内容を返す（編集は次回呼び出しで反映）。
+
     Raises:
         FileNotFoundError: YAMII.mdが存在しない場合
     """
-    if not DEFAULT_PROMPT_FILE.exists():
+    global _prompt_cache
+
+    # パスはそのままキーにする（resolve() はパス要素ごとに lstat が走るため）
+    prompt_file = DEFAULT_PROMPT_FILE
+    try:
+        stat = prompt_file.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"YAMII.md not found at {DEFAULT_PROMPT_FILE}. "
             "Please create config/YAMII.md with the system prompt."
-        )
+        ) from None
 
-    content = DEFAULT_PROMPT_FILE.read_text(encoding="utf-8")
-    return content.strip()
+    cache_key = (prompt_file, stat.st_mtime_ns, stat.st_size)
+    if _prompt_cache is not None and _prompt_cache[0] == cache_key:
+        return _prompt_cache[1]
 
+    content = prompt_file.read_text(encoding="utf-8").strip()
+    _prompt_cache = (cache_key, content)
+    return content
 
-@dataclass
+
+@dataclass(slots=True)
 class ConversationMessage:
     """会話履歴の1メッセージ"""
 
@@ -56,7 +79,7 @@ class ConversationMessage:
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class CounselingRequest:
     """カウンセリングリクエスト"""
 
@@ -72,11 +95,12 @@ class CounselingRequest:
             raise ValueError("メッセージは必須です")
         if not self.user_id or not self.user_id.strip():
             raise ValueError("ユーザーIDは必須です")
-        if self.session_id is None:
+        # 未指定（空文字を含む）の場合のみここで一度だけ採番する
+        if not self.session_id:
             self.session_id = str(uuid.uuid4())
 
 
-@dataclass
+@dataclass(slots=True)
 class CounselingResponse:
     """カウンセリングレスポンス"""
 
@@ -85,11 +109,7 @@ class CounselingResponse:
     emotion_analysis: EmotionAnalysis
     advice_type: str
     follow_up_questions: list[str]
-    timestamp: datetime = None
-
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
 
     @property
     def is_crisis(self) -> bool:
@@ -107,7 +127,7 @@ class CounselingResponse:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CounselingStreamContext:
     """ストリーミング応答のメタデータコンテキスト"""
 
@@ -200,25 +220,59 @@ class AdviceTypeClassifier:
             "health": ["健康", "病気", "体調", "病院", "医者", "症状"],
         }
 
+        # キーワード → カテゴリの優先順位（辞書の定義順、危機サポートが最優先）
+        self._categories = list(self._category_keywords)
+        keyword_ranks: dict[str, int] = {}
+        for rank, keywords in enumerate(self._category_keywords.values()):
+            for keyword in keywords:
+                keyword_ranks.setdefault(keyword, rank)
+
+        # 各位置の最長一致キーワード → その位置で一致する全キーワードの最優先順位
+        # （「うつ病」の位置では「うつ」も一致する）
+        self._keyword_ranks = {
+            longest: min(
+                rank
+                for keyword, rank in keyword_ranks.items()
+                if longest.startswith(keyword)
+            )
+            for longest in keyword_ranks
+        }
+
+        # 全カテゴリのキーワードの結合パターン（一度の走査で全カテゴリを判定）
+        self._keyword_pattern = re.compile(
+            "|".join(
+                re.escape(kw) for kw in sorted(keyword_ranks, key=len, reverse=True)
+            )
+        )
+
     def classify(self, message: str, emotion: EmotionType) -> str:
-        """メッセージと感情からアドバイスタイプを分類"""
-        message_lower = message.lower()
+        """
+        メッセージと感情からアドバイスタイプを分類
 
+        キーワードはすべて日本語のため、メッセージをそのまま照合する。
+        """
         # 危機的状況の優先判定
         if emotion == EmotionType.DEPRESSION:
             return "crisis_support"
 
-        for crisis_keyword in self._category_keywords["crisis_support"]:
-            if crisis_keyword in message_lower:
-                return "crisis_support"
-
-        # その他のカテゴリ判定
-        for category, keywords in self._category_keywords.items():
-            if category == "crisis_support":
-                continue
-
-            if any(keyword in message_lower for keyword in keywords):
-                return category
+        # キーワードはすべて日本語のため、ASCII文字のみのメッセージは走査しない
+        if message.isascii():
+            return "general_support"
+
+        # 一致したキーワードのうち最も優先度の高いカテゴリを採用
+        best_rank = len(self._categories)
+        search = self._keyword_pattern.search
+        match = search(message)
+        while match is not None:
+            rank = self._keyword_ranks[match.group()]
+            if rank < best_rank:
+                best_rank = rank
+                if rank == 0:
+                    break
+            match = search(message, match.start() + 1)
+
+        if best_rank < len(self._categories):
+            return self._categories[best_rank]
 
         return "general_support"
 
@@ -369,7 +423,7 @@ class CounselingService:
 
         # コンテキストオブジェクトを構築
         context = CounselingStreamContext(
-            session_id=request.session_id or str(uuid.uuid4()),
+            session_id=request.session_id,
             emotion_analysis=emotion_analysis,
             advice_type=advice_type,
             follow_up_questions=follow_up_questions,
@@ -480,15 +534,18 @@ class CounselingService:
         advice_type: str,
     ) -> None:
         """ユーザー状態を更新（パーソナライゼーション学習含む）"""
+        # 更新時刻はリクエスト内で共通
+        now = datetime.now()
+
         # インタラクション記録
-        user.update_interaction()
+        user.update_interaction(now=now)
 
         # 感情パターン更新
         self.emotion_service.update_user_patterns(user, emotion_analysis)
 
         # トピック更新
         user.add_known_topic(advice_type)
-        user.update_topic_affinity(advice_type)
+        user.update_topic_affinity(advice_type, now=now)
 
         # 表示名更新
         if request.user_name:
@@ -501,7 +558,7 @@ class CounselingService:
         self._update_trust_scores(user, emotion_analysis)
 
         # フェーズ更新チェック
-        self._update_phase_if_needed(user)
+        self._update_phase_if_needed(user, now)
 
         # Note: エピソード生成は Zero-Knowledge 設計のため削除（ノーログ）
         # Note: 危機時のフォローアップスケジュールは Proactive 機能削除のため削除
@@ -524,7 +581,7 @@ class CounselingService:
             user.likes_empathy = min(1.0, user.likes_empathy + learning_rate)
 
         # 特定のカテゴリはアドバイス志向として学習
-        if advice_type in ["career", "education", "health"]:
+        if advice_type in _ADVICE_ORIENTED_TYPES:
             user.likes_advice = min(1.0, user.likes_advice + learning_rate)
 
         # 学習の確信度を上げる
@@ -550,10 +607,10 @@ class CounselingService:
         trust_increase = base_increase * (1 + user.openness_score)
         user.trust_score = min(1.0, user.trust_score + trust_increase)
 
-    def _update_phase_if_needed(self, user: UserState) -> None:
+    def _update_phase_if_needed(
+        self, user: UserState, now: datetime | None = None
+    ) -> None:
         """フェーズ更新が必要かチェック（信頼スコアも考慮）"""
-        from ..models.relationship import PhaseTransition
-
         current_phase = user.phase
         new_phase = current_phase
 
@@ -576,7 +633,7 @@ class CounselingService:
             transition = PhaseTransition(
                 from_phase=current_phase,
                 to_phase=new_phase,
-                transitioned_at=datetime.now(),
+                transitioned_at=now or datetime.now(),
                 interaction_count=interactions,
                 trigger=f"trust:{trust:.2f}",
             )
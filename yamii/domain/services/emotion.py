@@ -21,41 +21,293 @@ from ..models.user import UserState
 if TYPE_CHECKING:
     from ..ports.ai_port import IAIProvider
 
+# 同スコア時の主要感情の優先度順
+_EMOTION_PRIORITY: tuple[EmotionType, ...] = (
+    EmotionType.DEPRESSION,
+    EmotionType.ANXIETY,
+    EmotionType.SADNESS,
+    EmotionType.ANGER,
+    EmotionType.STRESS,
+    EmotionType.LONELINESS,
+    EmotionType.CONFUSION,
+    EmotionType.HAPPINESS,
+    EmotionType.HOPE,
+)
 
-class EmotionService:
-    """
-    統合感情分析サービス
+# 感情キーワード辞書（拡張版）
+_EMOTION_KEYWORDS: dict[EmotionType, dict] = {
+    EmotionType.HAPPINESS: {
+        "keywords": [
+            "嬉しい",
+            "楽しい",
+            "幸せ",
+            "最高",
+            "素晴らしい",
+            "感動",
+            "感激",
+            "興奮",
+            "ワクワク",
+            "ドキドキ",
+            "やったー",
+            "よっしゃ",
+            "やった",
+            "成功",
+            "達成",
+            "感謝",
+            "ありがとう",
+            "愛してる",
+            "大好き",
+            "完璧",
+            "理想",
+        ],
+        "weight": 2.0,
+    },
+    EmotionType.SADNESS: {
+        "keywords": [
+            "悲しい",
+            "辛い",
+            "苦しい",
+            "切ない",
+            "寂しい",
+            "孤独",
+            "絶望",
+            "失望",
+            "落ち込む",
+            "凹む",
+            "しんどい",
+            "終わり",
+            "諦める",
+            "無理",
+            "ダメ",
+            "失敗",
+            "後悔",
+            "申し訳ない",
+            "ごめん",
+        ],
+        "weight": 3.0,
+    },
+    EmotionType.ANXIETY: {
+        "keywords": [
+            "不安",
+            "心配",
+            "怖い",
+            "恐い",
+            "緊張",
+            "ハラハラ",
+            "焦る",
+            "急ぐ",
+            "間に合わない",
+            "やばい",
+            "まずい",
+            "危険",
+            "大変",
+            "困る",
+            "どうしよう",
+            "助けて",
+            "助け",
+            "救い",
+        ],
+        "weight": 2.5,
+    },
+    EmotionType.ANGER: {
+        "keywords": [
+            "怒り",
+            "イライラ",
+            "腹立つ",
+            "ムカつく",
+            "キレる",
+            "許せない",
+            "最悪",
+            "うざい",
+            "うるさい",
+            "しつこい",
+            "めんどくさい",
+            "やだ",
+            "嫌い",
+            "大嫌い",
+        ],
+        "weight": 3.0,
+    },
+    EmotionType.LONELINESS: {
+        "keywords": [
+            "寂しい",
+            "孤独",
+            "ひとり",
+            "一人",
+            "孤立",
+            "誰もいない",
+            "ひとりぼっち",
+            "仲間がいない",
+            "理解されない",
+            "孤独感",
+        ],
+        "weight": 2.5,
+    },
+    EmotionType.DEPRESSION: {
+        "keywords": [
+            "死にたい",
+            "消えたい",
+            "生きる意味",
+            "無気力",
+            "やる気がない",
+            "生きていく意味",
+            "もう限界",
+            "生きるのが辛い",
+            "自分を傷つけ",
+        ],
+        "weight": 5.0,  # 最高重要度
+    },
+    EmotionType.STRESS: {
+        "keywords": [
+            "疲れた",
+            "しんどい",
+            "限界",
+            "プレッシャー",
+            "ストレス",
+            "忙しい",
+            "余裕がない",
+            "追い詰められ",
+            "パンク",
+        ],
+        "weight": 2.0,
+    },
+    EmotionType.CONFUSION: {
+        "keywords": [
+            "わからない",
+            "迷っている",
+            "どうしたら",
+            "困っている",
+            "混乱",
+            "判断できない",
+            "決められない",
+            "迷子",
+        ],
+        "weight": 1.5,
+    },
+    EmotionType.HOPE: {
+        "keywords": [
+            "頑張りたい",
+            "変わりたい",
+            "希望",
+            "前向き",
+            "未来",
+            "目標",
+            "夢",
+            "可能性",
+            "チャンス",
+            "成長",
+        ],
+        "weight": 2.0,
+    },
+}
 
-    パフォーマンス最適化:
-    - 正規表現パターンを事前コンパイル
-    - 危機キーワードの早期検出
-    - キーワードセットによる高速マッチング
 
-    LLM併用機能:
-    - キーワード分析が曖昧なケースでLLMに依頼
-    - 婉曲表現（「もういいかな」等）を検出
+def _build_keyword_index(
+    emotion_keywords: dict[EmotionType, dict],
+) -> tuple[
+    dict[str, tuple[tuple[str, tuple[tuple[EmotionType, float], ...]], ...]],
+    re.Pattern,
+]:
     """
+    感情キーワードの走査用インデックスを構築
 
-    def __init__(self, ai_provider: IAIProvider | None = None):
-        # LLM併用のためのAIプロバイダー（オプション）
-        self._ai_provider = ai_provider
+    Returns:
+        (最長一致キーワード → その位置で同時に一致する全キーワードと重み,
+         全キーワードの結合パターン)
+    """
+    # キーワード → (感情, 重み) の対応表（複数の感情に属するキーワードもある）
+    keyword_weights: dict[str, list[tuple[EmotionType, float]]] = {}
+    for emotion_type, emotion_data in emotion_keywords.items():
+        for kw in emotion_data["keywords"]:
+            keyword_weights.setdefault(kw, []).append(
+                (emotion_type, emotion_data["weight"])
+            )
+
+    # 各位置の最長一致キーワード → その位置で同時に一致する全キーワード
+    # （「やったー」の位置では「やった」も一致する）
+    keyword_hits = {
+        longest: tuple(
+            (kw, tuple(weights))
+            for kw, weights in keyword_weights.items()
+            if longest.startswith(kw)
+        )
+        for longest in keyword_weights
+    }
+
+    # 全感情キーワードの結合パターン（一度の走査で全キーワードを検出）
+    # 長い順に並べて各位置の最長一致を取得する
+    keyword_pattern = re.compile(
+        "|".join(re.escape(kw) for kw in sorted(keyword_weights, key=len, reverse=True))
+    )
+    return keyword_hits, keyword_pattern
+
+
+# 走査用インデックスはインポート時に一度だけ構築し、全インスタンスで共有
+_KEYWORD_HITS, _KEYWORD_PATTERN = _build_keyword_index(_EMOTION_KEYWORDS)
+
+
+def _combine_patterns(patterns: list[str]) -> re.Pattern:
+    """いずれかに一致するかを一度の検索で判定できる結合パターンを構築"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+# 婉曲表現パターン（LLM分析のトリガー）
+_EUPHEMISM_PATTERN = _combine_patterns(
+    [
+        r"もういい(かな|や|よね|のかな)",
+        r"疲れた(かな|な|ね|よ)",
+        r"(どうでも|何も|全部)いい",
+        r"(意味|価値)(ない|がない|なんて)",
+        r"(誰も|何も)(わかって|理解して)くれない",
+        r"(いなく|消えて)(なりたい|しまいたい)",
+        r"楽になりたい",
+        r"(もう|全部)(終わり|おしまい)",
+        r"(生きて|いて)(も|て)(意味|仕方)",
+        r"(休み|眠り)たい(?!.*仕事|.*疲れ)",  # 仕事疲れ以外の文脈
+    ]
+)
 
-        # 婉曲表現パターン（LLM分析のトリガー）
-        self._euphemism_patterns: list[re.Pattern] = [
-            re.compile(r"もういい(かな|や|よね|のかな)"),
-            re.compile(r"疲れた(かな|な|ね|よ)"),
-            re.compile(r"(どうでも|何も|全部)いい"),
-            re.compile(r"(意味|価値)(ない|がない|なんて)"),
-            re.compile(r"(誰も|何も)(わかって|理解して)くれない"),
-            re.compile(r"(いなく|消えて)(なりたい|しまいたい)"),
-            re.compile(r"楽になりたい"),
-            re.compile(r"(もう|全部)(終わり|おしまい)"),
-            re.compile(r"(生きて|いて)(も|て)(意味|仕方)"),
-            re.compile(r"(休み|眠り)たい(?!.*仕事|.*疲れ)"),  # 仕事疲れ以外の文脈
-        ]
-
-        # LLM分析用プロンプト
-        self._llm_analysis_prompt = """あなたは感情分析の専門家です。以下のメッセージの感情を分析してください。
+# 誤検知を防ぐための除外パターン
+# 誇張表現（「死にたいくらい美味しい」など）
+_EXAGGERATION_PATTERN = _combine_patterns(
+    [
+        r"死にたい(くらい|ほど|程)",
+        r"死ぬ(くらい|ほど|程)",
+        r"(美味し|嬉し|楽し|可愛|綺麗|素敵|最高).{0,5}(死にたい|死ぬ)",
+        r"(死にたい|死ぬ).{0,5}(美味し|嬉し|楽し|可愛|綺麗|素敵|最高)",
+    ]
+)
+
+# 哲学的・質問形式のパターン（「生きる意味って何？」など）
+_PHILOSOPHICAL_PATTERN = _combine_patterns(
+    [
+        r"(生きる意味|人生の意味|存在意義).{0,5}(って|とは|は).{0,5}(何|なに|なん)",
+        r"(何|なに|なん).{0,5}(だと思|と思|でしょう|かな)",
+        r"(意味|価値).{0,5}(ある|あるの|教えて|知りたい)",
+        r"(哲学|考え|思想)",
+    ]
+)
+
+# 危機キーワード
+_CRISIS_KEYWORDS: frozenset[str] = frozenset(
+    {
+        "死にたい",
+        "消えたい",
+        "自殺",
+        "生きる意味がない",
+        "もう限界",
+        "自分を傷つけ",
+        "生きていく意味",
+        "死んだ方がマシ",
+        "終わりにしたい",
+    }
+)
+
+# 危機キーワードの結合パターン（一度の検索で全チェック）
+_CRISIS_PATTERN = re.compile("|".join(re.escape(kw) for kw in _CRISIS_KEYWORDS))
+
+# LLM分析用プロンプト
+_LLM_ANALYSIS_PROMPT = """あなたは感情分析の専門家です。以下のメッセージの感情を分析してください。
 
 特に以下の婉曲表現に注意してください:
 - 「もういいかな」「疲れた」→ 絶望や危機的状況を示唆する可能性
@@ -72,202 +324,34 @@ JSON形式で回答してください:
 
 メッセージ: """
 
-        # 感情キーワード辞書（拡張版）
-        self._emotion_keywords = {
-            EmotionType.HAPPINESS: {
-                "keywords": [
-                    "嬉しい",
-                    "楽しい",
-                    "幸せ",
-                    "最高",
-                    "素晴らしい",
-                    "感動",
-                    "感激",
-                    "興奮",
-                    "ワクワク",
-                    "ドキドキ",
-                    "やったー",
-                    "よっしゃ",
-                    "やった",
-                    "成功",
-                    "達成",
-                    "感謝",
-                    "ありがとう",
-                    "愛してる",
-                    "大好き",
-                    "完璧",
-                    "理想",
-                ],
-                "weight": 2.0,
-            },
-            EmotionType.SADNESS: {
-                "keywords": [
-                    "悲しい",
-                    "辛い",
-                    "苦しい",
-                    "切ない",
-                    "寂しい",
-                    "孤独",
-                    "絶望",
-                    "失望",
-                    "落ち込む",
-                    "凹む",
-                    "しんどい",
-                    "終わり",
-                    "諦める",
-                    "無理",
-                    "ダメ",
-                    "失敗",
-                    "後悔",
-                    "申し訳ない",
-                    "ごめん",
-                ],
-                "weight": 3.0,
-            },
-            EmotionType.ANXIETY: {
-                "keywords": [
-                    "不安",
-                    "心配",
-                    "怖い",
-                    "恐い",
-                    "緊張",
-                    "ハラハラ",
-                    "焦る",
-                    "急ぐ",
-                    "間に合わない",
-                    "やばい",
-                    "まずい",
-                    "危険",
-                    "大変",
-                    "困る",
-                    "どうしよう",
-                    "助けて",
-                    "助け",
-                    "救い",
-                ],
-                "weight": 2.5,
-            },
-            EmotionType.ANGER: {
-                "keywords": [
-                    "怒り",
-                    "イライラ",
-                    "腹立つ",
-                    "ムカつく",
-                    "キレる",
-                    "許せない",
-                    "最悪",
-                    "うざい",
-                    "うるさい",
-                    "しつこい",
-                    "めんどくさい",
-                    "やだ",
-                    "嫌い",
-                    "大嫌い",
-                ],
-                "weight": 3.0,
-            },
-            EmotionType.LONELINESS: {
-                "keywords": [
-                    "寂しい",
-                    "孤独",
-                    "ひとり",
-                    "一人",
-                    "孤立",
-                    "誰もいない",
-                    "ひとりぼっち",
-                    "仲間がいない",
-                    "理解されない",
-                    "孤独感",
-                ],
-                "weight": 2.5,
-            },
-            EmotionType.DEPRESSION: {
-                "keywords": [
-                    "死にたい",
-                    "消えたい",
-                    "生きる意味",
-                    "無気力",
-                    "やる気がない",
-                    "生きていく意味",
-                    "もう限界",
-                    "生きるのが辛い",
-                    "自分を傷つけ",
-                ],
-                "weight": 5.0,  # 最高重要度
-            },
-            EmotionType.STRESS: {
-                "keywords": [
-                    "疲れた",
-                    "しんどい",
-                    "限界",
-                    "プレッシャー",
-                    "ストレス",
-                    "忙しい",
-                    "余裕がない",
-                    "追い詰められ",
-                    "パンク",
-                ],
-                "weight": 2.0,
-            },
-            EmotionType.CONFUSION: {
-                "keywords": [
-                    "わからない",
-                    "迷っている",
-                    "どうしたら",
-                    "困っている",
-                    "混乱",
-                    "判断できない",
-                    "決められない",
-                    "迷子",
-                ],
-                "weight": 1.5,
-            },
-            EmotionType.HOPE: {
-                "keywords": [
-                    "頑張りたい",
-                    "変わりたい",
-                    "希望",
-                    "前向き",
-                    "未来",
-                    "目標",
-                    "夢",
-                    "可能性",
-                    "チャンス",
-                    "成長",
-                ],
-                "weight": 2.0,
-            },
-        }
+_LLM_ANALYSIS_SYSTEM_PROMPT = "あなたは感情分析AIです。JSON形式のみで回答してください。"
 
-        # 危機キーワード（セットで高速検索）
-        self._crisis_keywords: set[str] = {
-            "死にたい",
-            "消えたい",
-            "自殺",
-            "生きる意味がない",
-            "もう限界",
-            "自分を傷つけ",
-            "生きていく意味",
-            "死んだ方がマシ",
-            "終わりにしたい",
-        }
 
-        # 誤検知を防ぐための除外パターン
-        # 誇張表現（「死にたいくらい美味しい」など）
-        self._exaggeration_patterns: list[re.Pattern] = [
-            re.compile(r"死にたい(くらい|ほど|程)"),
-            re.compile(r"死ぬ(くらい|ほど|程)"),
-            re.compile(r"(美味し|嬉し|楽し|可愛|綺麗|素敵|最高).{0,5}(死にたい|死ぬ)"),
-            re.compile(r"(死にたい|死ぬ).{0,5}(美味し|嬉し|楽し|可愛|綺麗|素敵|最高)"),
-        ]
-
-        # 哲学的・質問形式のパターン（「生きる意味って何？」など）
-        self._philosophical_patterns: list[re.Pattern] = [
-            re.compile(r"(生きる意味|人生の意味|存在意義).{0,5}(って|とは|は).{0,5}(何|なに|なん)"),
-            re.compile(r"(何|なに|なん).{0,5}(だと思|と思|でしょう|かな)"),
-            re.compile(r"(意味|価値).{0,5}(ある|あるの|教えて|知りたい)"),
-            re.compile(r"(哲学|考え|思想)"),
-        ]
+class EmotionService:
+    """
+    統合感情分析サービス
+
+    パフォーマンス最適化:
+    - 正規表現パターンを事前コンパイル
+    - 危機キーワードの早期検出
+    - 全感情キーワードを結合パターンで一度に走査
+    - 走査用インデックスはインポート時に構築し全インスタンスで共有
+
+    LLM併用機能:
+    - キーワード分析が曖昧なケースでLLMに依頼
+    - 婉曲表現（「もういいかな」等）を検出
+    """
+
+    def __init__(self, ai_provider: IAIProvider | None = None):
+        # LLM併用のためのAIプロバイダー（オプション）
+        self._ai_provider = ai_provider
+
+        # パターン・プロンプトはインポート時に一度だけ構築し、全インスタンスで共有
+        self._euphemism_pattern = _EUPHEMISM_PATTERN
+        self._crisis_keywords = _CRISIS_KEYWORDS
+        self._crisis_pattern = _CRISIS_PATTERN
+        self._exaggeration_pattern = _EXAGGERATION_PATTERN
+        self._philosophical_pattern = _PHILOSOPHICAL_PATTERN
 
         # 強調語・修飾語（セットで高速検索）
         self._emphasis_words: set[str] = {
@@ -288,19 +372,6 @@ JSON形式で回答してください:
             "ちがう",
         }
 
-        # 事前コンパイル済みパターン
-        self._compiled_patterns: dict[EmotionType, list[tuple[re.Pattern, float]]] = {}
-        for emotion_type, emotion_data in self._emotion_keywords.items():
-            weight = emotion_data["weight"]
-            patterns = [
-                (re.compile(re.escape(kw)), weight) for kw in emotion_data["keywords"]
-            ]
-            self._compiled_patterns[emotion_type] = patterns
-
-        # 危機キーワードの結合パターン（一度の検索で全チェック）
-        crisis_pattern = "|".join(re.escape(kw) for kw in self._crisis_keywords)
-        self._crisis_pattern = re.compile(crisis_pattern)
-
     def analyze(self, message: str) -> EmotionAnalysis:
         """
         メッセージの感情を分析（同期版・キーワードベースのみ）
@@ -348,17 +419,21 @@ JSON形式で回答してください:
         if not message or not message.strip():
             return EmotionAnalysis.neutral()
 
+        # キーワード・パターンはすべて日本語（大文字小文字の区別がない）のため、
+        # lower() による文字列の複製は行わない
         message = message.strip()
-        message_lower = message.lower()
 
         # 危機状況の早期検出（最優先）
-        is_crisis = self._detect_crisis_fast(message_lower)
+        is_crisis, is_philosophical = self._detect_crisis_fast(message)
 
         # 各感情のスコアを計算（最適化版）
-        emotion_scores = self._calculate_emotion_scores_fast(message_lower)
+        emotion_scores = self._calculate_emotion_scores_fast(message)
 
-        # 修飾語の影響を計算
-        emotion_scores = self._apply_modifiers_fast(message, emotion_scores)
+        # 単語分割は修飾語判定と信頼度計算で共有する
+        words = message.split()
+
+        # 修飾語の影響を計算（スコア辞書をその場で調整）
+        self._apply_modifiers_fast(words, emotion_scores)
 
         # 主要感情を特定
         primary_emotion, intensity = self._determine_primary_emotion(emotion_scores)
@@ -367,15 +442,17 @@ JSON形式で回答してください:
         # スコア3.0以上 = 明確な危機キーワードが含まれている場合のみ
         depression_score = emotion_scores.get(EmotionType.DEPRESSION, 0)
         if not is_crisis and depression_score >= 3.0:
-            # ただし哲学的質問の場合は除外
-            if not self._is_philosophical_question(message):
+            # ただし哲学的質問の場合は除外（危機検出で判定済みなら再利用）
+            if is_philosophical is None:
+                is_philosophical = self._is_philosophical_question(message)
+            if not is_philosophical:
                 is_crisis = True
 
         # 安定性を計算
         stability = self._calculate_stability(emotion_scores)
 
         # 信頼度を計算
-        confidence = self._calculate_confidence(emotion_scores, message)
+        confidence = self._calculate_confidence(emotion_scores, message, len(words))
 
         return EmotionAnalysis(
             primary_emotion=primary_emotion,
@@ -387,35 +464,36 @@ JSON形式で回答してください:
         )
 
     def _needs_llm_analysis(self, message: str, keyword_result: EmotionAnalysis) -> bool:
-        """LLM分析が必要かどうか判定"""
-        # 1. 婉曲表現パターンにマッチした場合
-        for pattern in self._euphemism_patterns:
-            if pattern.search(message):
-                return True
+        """
+        LLM分析が必要かどうか判定
 
-        # 2. キーワード分析の信頼度が低い場合
+        いずれかの条件を満たせばよいため、安価な判定から先に行い
+        正規表現による婉曲表現の走査は最後に回す。
+        """
+        # 1. キーワード分析の信頼度が低い場合
         if keyword_result.confidence < 0.3:
             return True
 
-        # 3. 中性だが一定の長さがある場合（感情が隠れている可能性）
+        # 2. 中性だが一定の長さがある場合（感情が隠れている可能性）
         if (
             keyword_result.primary_emotion == EmotionType.NEUTRAL
             and len(message) > 30
         ):
             return True
 
-        return False
+        # 3. 婉曲表現パターンにマッチした場合
+        return self._euphemism_pattern.search(message) is not None
 
     async def _analyze_with_llm(
         self, message: str, keyword_result: EmotionAnalysis
     ) -> EmotionAnalysis:
         """LLMを使った深い感情分析"""
         try:
-            prompt = self._llm_analysis_prompt + message
+            prompt = _LLM_ANALYSIS_PROMPT + message
 
             response = await self._ai_provider.generate(
                 message=prompt,
-                system_prompt="あなたは感情分析AIです。JSON形式のみで回答してください。",
+                system_prompt=_LLM_ANALYSIS_SYSTEM_PROMPT,
                 max_tokens=200,
             )
 
@@ -504,79 +582,87 @@ JSON形式で回答してください:
             confidence=min(keyword_result.confidence + 0.2, 1.0),
         )
 
-    def _detect_crisis_fast(self, message_lower: str) -> bool:
+    def _detect_crisis_fast(self, message: str) -> tuple[bool, bool | None]:
         """
         危機状況の高速検出（文脈を考慮）
 
         誇張表現や哲学的質問の場合は危機として扱わない
+
+        Returns:
+            (危機かどうか, 哲学的質問かどうか（未判定の場合はNone）)
         """
         # まず危機キーワードがあるかチェック
-        if not self._crisis_pattern.search(message_lower):
-            return False
+        if not self._crisis_pattern.search(message):
+            return False, None
 
         # 誇張表現の場合は危機として扱わない
-        if self._is_exaggeration_context(message_lower):
-            return False
+        if self._is_exaggeration_context(message):
+            return False, None
 
         # 哲学的質問の場合は危機として扱わない
-        if self._is_philosophical_question(message_lower):
-            return False
-
-        return True
+        is_philosophical = self._is_philosophical_question(message)
+        return not is_philosophical, is_philosophical
 
     def _is_exaggeration_context(self, message: str) -> bool:
         """誇張表現かどうかを判定（「死にたいくらい美味しい」など）"""
-        for pattern in self._exaggeration_patterns:
-            if pattern.search(message):
-                return True
-        return False
+        return self._exaggeration_pattern.search(message) is not None
 
     def _is_philosophical_question(self, message: str) -> bool:
         """哲学的質問かどうかを判定（「生きる意味って何？」など）"""
-        for pattern in self._philosophical_patterns:
-            if pattern.search(message):
-                return True
-        return False
-
-    def _calculate_emotion_scores_fast(
-        self, message_lower: str
-    ) -> dict[EmotionType, float]:
-        """各感情のスコアを高速計算（事前コンパイル済みパターン使用）"""
-        scores = {emotion: 0.0 for emotion in EmotionType}
+        return self._philosophical_pattern.search(message) is not None
+
+    def _calculate_emotion_scores_fast(self, message: str) -> dict[EmotionType, float]:
+        """
+        各感情のスコアを高速計算（結合パターンで一度だけ走査）
 
-        for emotion_type, patterns in self._compiled_patterns.items():
-            score = 0.0
-            for pattern, weight in patterns:
-                matches = pattern.findall(message_lower)
-                score += len(matches) * weight
-            scores[emotion_type] = score
+        キーワードごとの出現回数は重ならない出現のみを数える。
+        """
+        scores = {emotion: 0.0 for emotion in EmotionType}
+        # キーワードはすべて日本語（非ASCII文字を含む）のため、
+        # ASCII文字のみのメッセージは走査するまでもなく一致しない
+        if message.isascii():
+            return scores
+
+        # キーワードごとの直前の出現終了位置
+        last_end: dict[str, int] = {}
+        search = _KEYWORD_PATTERN.search
+
+        # 一致位置の次の文字から再検索し、重なり合う別キーワードも検出する
+        match = search(message)
+        while match is not None:
+            start = match.start()
+            for kw, weights in _KEYWORD_HITS[match.group()]:
+                if start < last_end.get(kw, 0):
+                    continue
+                last_end[kw] = start + len(kw)
+                for emotion_type, weight in weights:
+                    scores[emotion_type] += weight
+            match = search(message, start + 1)
 
         return scores
 
     def _apply_modifiers_fast(
-        self, message: str, scores: dict[EmotionType, float]
-    ) -> dict[EmotionType, float]:
-        """修飾語による感情スコアの高速調整"""
-        modified_scores = scores.copy()
+        self, words: list[str], scores: dict[EmotionType, float]
+    ) -> None:
+        """
+        修飾語による感情スコアの高速調整
 
+        スコア辞書は呼び出し側で毎回新規作成されるため、複製せずその場で更新する。
+        """
         # 否定語の検出（単語単位でセット比較）
-        message_words = set(message.split())
+        message_words = set(words)
         has_negation = bool(self._negation_words & message_words)
         if has_negation:
-            modified_scores[EmotionType.HAPPINESS] = max(
-                0, modified_scores[EmotionType.HAPPINESS] - 2
-            )
-            modified_scores[EmotionType.SADNESS] += 1
-            modified_scores[EmotionType.ANXIETY] += 1
+            scores[EmotionType.HAPPINESS] = max(0, scores[EmotionType.HAPPINESS] - 2)
+            scores[EmotionType.SADNESS] += 1
+            scores[EmotionType.ANXIETY] += 1
 
         # 強調語の検出（単語単位でセット比較）
         has_emphasis = bool(self._emphasis_words & message_words)
         if has_emphasis:
-            for emotion in modified_scores:
+            for emotion in scores:
                 if emotion != EmotionType.NEUTRAL:
-                    modified_scores[emotion] *= 1.5
-
-        return modified_scores
+                    scores[emotion] *= 1.5
 
     def update_user_patterns(self, user: UserState, analysis: EmotionAnalysis) -> None:
         """
@@ -622,37 +708,25 @@ JSON形式で回答してください:
     def _determine_primary_emotion(
         self, scores: dict[EmotionType, float]
     ) -> tuple[EmotionType, float]:
-        """主要感情と強度を決定"""
-        max_score = max(scores.values()) if scores.values() else 0
+        """
+        主要感情と強度を決定
 
-        if max_score == 0:
+        優先度順に一度だけ走査し、より高いスコアでのみ更新することで
+        同スコア時は優先度の高い感情が選ばれる。
+        """
+        primary_emotion = EmotionType.NEUTRAL
+        max_score = 0.0
+        for emotion_type in _EMOTION_PRIORITY:
+            score = scores.get(emotion_type, 0.0)
+            if score > max_score:
+                primary_emotion = emotion_type
+                max_score = score
+
+        if primary_emotion is EmotionType.NEUTRAL:
             return EmotionType.NEUTRAL, 0.0
 
-        # 最高スコアの感情を特定
-        primary_emotions = [
-            emotion for emotion, score in scores.items() if score == max_score
-        ]
-
-        # 複数の感情が同じスコアの場合、優先度順で選択
-        priority_order = [
-            EmotionType.DEPRESSION,
-            EmotionType.ANXIETY,
-            EmotionType.SADNESS,
-            EmotionType.ANGER,
-            EmotionType.STRESS,
-            EmotionType.LONELINESS,
-            EmotionType.CONFUSION,
-            EmotionType.HAPPINESS,
-            EmotionType.HOPE,
-        ]
-
-        for emotion_type in priority_order:
-            if emotion_type in primary_emotions:
-                # 強度を0.0-1.0に正規化
-                intensity = min(max_score / 10.0, 1.0)
-                return emotion_type, intensity
-
-        return EmotionType.NEUTRAL, 0.0
+        # 強度を0.0-1.0に正規化
+        return primary_emotion, min(max_score / 10.0, 1.0)
 
     def _calculate_stability(self, scores: dict[EmotionType, float]) -> float:
         """感情の安定性を計算"""
@@ -670,7 +744,7 @@ JSON形式で回答してください:
         return concentration
 
     def _calculate_confidence(
-        self, scores: dict[EmotionType, float], message: str
+        self, scores: dict[EmotionType, float], message: str, word_count: int
     ) -> float:
         """分析の信頼度を計算"""
         total_score = sum(scores.values())
@@ -683,8 +757,7 @@ JSON形式で回答してください:
         length_factor = min(len(message) / 50, 1.0)
 
         # 感情キーワード密度による調整
-        word_count = max(len(message.split()), 1)
-        emotion_density = total_score / word_count
+        emotion_density = total_score / max(word_count, 1)
         density_factor = min(emotion_density / 2.0, 1.0)
 
         confidence = (base_confidence + length_factor + density_factor) / 3.0